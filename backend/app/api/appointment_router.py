@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.db import models
 from backend.app.db.models import User
-from backend.app.services import appointment_service
+from backend.app.services import appointment_service, appointment_series_service
+from backend.app.services.booking_pipeline import booking_pipeline
 from backend.app.db import schemas
-from backend.app.core.dependencies import get_db, get_current_user_or_admin, get_user_by_token
+from backend.app.db.init_db import AsyncSessionLocal
+from backend.app.core.config import settings
+from backend.app.core.dependencies import get_db, get_current_admin_user, get_current_user_or_admin, get_user_by_token
+from backend.app.core.etag import ETag
+from backend.app.core.pagination import PageParams, page_response
 from datetime import datetime
 
 router = APIRouter()
@@ -15,10 +22,73 @@ async def create_appointment(
     current_user: schemas.User = Depends(get_user_by_token),
     db: AsyncSession = Depends(get_db)
 ):
+    if settings.booking_pipeline:
+        return await booking_pipeline.create(appointment, current_user.id)
     return await appointment_service.create_appointment(db, appointment, current_user.id)
 
 
-@router.get("/{appointment_id}", response_model=schemas.Appointment)
+@router.post("/series", response_model=schemas.AppointmentSeries)
+async def create_appointment_series(
+    series: schemas.AppointmentSeriesCreate,
+    current_user: schemas.User = Depends(get_user_by_token),
+    db: AsyncSession = Depends(get_db)
+):
+    return await appointment_series_service.create_appointment_series(db, series, current_user.id)
+
+
+@router.post("/cancel", response_model=schemas.AppointmentCancellationSummary)
+async def cancel_appointments(
+    cancellation: schemas.AppointmentCancellation,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    return await appointment_service.cancel_appointments(db, cancellation)
+
+
+@router.get("/filter", response_model=list[schemas.Appointment])
+async def read_appointments_by_filters(
+    room_id: int = None,
+    start_time: datetime = None,
+    end_time: datetime = None,
+    page: PageParams = Depends(),
+    etag: str = Depends(ETag(models.Appointment)),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(
+        await appointment_service.get_appointments_by_filters(
+            db, room_id, start_time, end_time, page.cursor, page.limit
+        ),
+        schemas.AppointmentList,
+        etag
+    )
+
+
+@router.get("/export")
+async def export_appointments(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    room_id: int = None,
+    start_time: datetime = None,
+    end_time: datetime = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    async def export_rows():
+        async with AsyncSessionLocal() as db:
+            async for chunk in appointment_service.export_appointments(
+                db, export_format, room_id, start_time, end_time
+            ):
+                yield chunk
+
+    if export_format == "csv":
+        return StreamingResponse(
+            export_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=appointments.csv"}
+        )
+    return StreamingResponse(export_rows(), media_type="application/x-ndjson")
+
+
+@router.get("/{appointment_id}", response_model=schemas.Appointment,
+            dependencies=[Depends(ETag(models.Appointment, key="appointment_id"))])
 async def read_appointment(appointment_id: int, db: AsyncSession = Depends(get_db)):
     appointment = await appointment_service.get_appointment(db, appointment_id)
     if appointment is None:
@@ -27,8 +97,17 @@ async def read_appointment(appointment_id: int, db: AsyncSession = Depends(get_d
 
 
 @router.get("/", response_model=list[schemas.Appointment])
-async def read_appointments(user_id: int = None, db: AsyncSession = Depends(get_db)):
-    return await appointment_service.get_appointments(db, user_id)
+async def read_appointments(
+    user_id: int = None,
+    page: PageParams = Depends(),
+    etag: str = Depends(ETag(models.Appointment)),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(
+        await appointment_service.get_appointments(db, user_id, page.cursor, page.limit),
+        schemas.AppointmentList,
+        etag
+    )
 
 
 @router.put("/{appointment_id}", response_model=schemas.Appointment)
@@ -48,6 +127,8 @@ async def update_appointment(
             detail="Not enough permissions to update this appointment"
         )
 
+    if settings.booking_pipeline:
+        return await booking_pipeline.update(appointment.room_id or appointment_db.room_id, appointment_id, appointment)
     db_appointment = await appointment_service.update_appointment(db, appointment_id, appointment)
     return db_appointment
 
@@ -56,27 +137,16 @@ async def update_appointment(
 async def delete_appointment(
     appointment_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_or_admin)
+    current_user: User = Depends(get_user_by_token)
 ):
+    # one fetch serves the permission check, the 404 and the delete
     appointment_db = await appointment_service.get_appointment(db, appointment_id)
-    if not appointment_db:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
-
-    if appointment_db.user_id != current_user.id and current_user.role != "admin":
+    if current_user.role != "admin" and (appointment_db is None or appointment_db.user_id != current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to delete this appointment"
         )
+    if not appointment_db:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
 
-    await appointment_service.delete_appointment(db, appointment_id)
-    return appointment_db
-
-
-@router.get("/filter", response_model=list[schemas.Appointment])
-async def read_appointments_by_filters(
-    room_id: int = None,
-    start_time: datetime = None,
-    end_time: datetime = None,
-    db: AsyncSession = Depends(get_db)
-):
-    return await appointment_service.get_appointments_by_filters(db, room_id, start_time, end_time)
+    return await appointment_service.delete_appointment(db, appointment_id, appointment_db)
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import timezone
+
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from backend.app.core.config import settings
+from backend.app.db import schemas
+from backend.app.services.availability_events import Subscription, availability_hub
+
+MAX_SUBSCRIBED_IDS = 1000
+TRY_AGAIN_LATER = 1013
+
+router = APIRouter()
+
+
+@router.websocket("/ws")
+async def availability_updates(websocket: WebSocket):
+    await websocket.accept()
+    subscription = Subscription(settings.availability_queue_size)
+    sender = asyncio.create_task(_send_events(websocket, subscription))
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                request = schemas.AvailabilitySubscription.model_validate_json(data)
+            except ValidationError as e:
+                subscription.send(_message("error", detail=e.errors(include_url=False, include_context=False)))
+                continue
+            start_time, end_time = _naive_utc(request.start_time), _naive_utc(request.end_time)
+            if start_time >= end_time:
+                subscription.send(_message("error", detail="Start time must be before end time"))
+                continue
+            if len(request.room_ids) + len(request.resource_ids) > MAX_SUBSCRIBED_IDS:
+                subscription.send(_message("error", detail=f"At most {MAX_SUBSCRIBED_IDS} rooms and resources"))
+                continue
+
+            availability_hub.subscribe(subscription, request.room_ids, request.resource_ids, start_time, end_time)
+            subscription.send(_message(
+                "subscribed",
+                room_ids=sorted(subscription.room_ids),
+                resource_ids=sorted(subscription.resource_ids),
+                start_time=start_time,
+                end_time=end_time
+            ))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        availability_hub.unsubscribe(subscription)
+        sender.cancel()
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription):
+    while True:
+        message = await subscription.queue.get()
+        if message is None:
+            await websocket.close(code=TRY_AGAIN_LATER, reason="Events may have been missed, resubscribe")
+            return
+        await websocket.send_text(message)
+
+
+def _message(message_type: str, **fields):
+    return orjson.dumps({"type": message_type, **fields}).decode()
+
+
+def _naive_utc(value):
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
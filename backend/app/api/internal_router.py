@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+
+from backend.app.core.auth_cache import auth_cache
+from backend.app.core.utils import password_hash_pool
+from backend.app.db.init_db import engine
+from backend.app.db.pool import InstrumentedQueuePool
+from backend.app.services.availability_events import availability_hub
+from backend.app.services.booking_pipeline import booking_pipeline
+from backend.app.services.catalog import catalog
+
+router = APIRouter()
+
+
+@router.get("/password-hashing", response_model=dict)
+async def read_password_hashing_stats():
+    return password_hash_pool.stats()
+
+
+@router.get("/auth-cache", response_model=dict)
+async def read_auth_cache_stats():
+    return auth_cache.stats()
+
+
+@router.get("/pool", response_model=dict)
+async def read_pool_stats():
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        return engine.pool.stats()
+    return {"pool": type(engine.pool).__name__, "status": engine.pool.status()}
+
+
+@router.get("/catalog", response_model=dict)
+async def read_catalog_stats():
+    return catalog.stats()
+
+
+@router.get("/availability-hub", response_model=dict)
+async def read_availability_hub_stats():
+    return availability_hub.stats()
+
+
+@router.get("/booking-pipeline", response_model=dict)
+async def read_booking_pipeline_stats():
+    return booking_pipeline.stats()
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.services import resource_service
-from backend.app.db import schemas
+from backend.app.db import models, schemas
 from backend.app.core.dependencies import get_db
+from backend.app.core.etag import ETag
+from backend.app.core.pagination import PageParams, page_response
 
 router = APIRouter()
 
@@ -12,20 +14,18 @@ async def create_resource(resource: schemas.ResourceCreate, db: AsyncSession = D
     return await resource_service.create_resource(db, resource)
 
 
-@router.get("/{resource_id}", response_model=schemas.Resource)
-async def read_resource(resource_id: int, db: AsyncSession = Depends(get_db)):
-    resource = await resource_service.get_resource(db, resource_id)
-    if resource is None:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    return resource
-
-
 @router.get("/", response_model=list[schemas.Resource])
-async def read_resources(db: AsyncSession = Depends(get_db)):
-    return await resource_service.get_resources(db)
+async def read_resources(
+    page: PageParams = Depends(),
+    etag: str = Depends(ETag(models.Resource, snapshot=True)),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(
+        await resource_service.get_resources(db, page.cursor, page.limit), schemas.ResourceList, etag
+    )
 
 
-@router.get("/available", response_model=list[schemas.Resource])
+@router.get("/available", response_model=list[schemas.Resource], dependencies=[Depends(ETag(models.Resource))])
 async def read_available_resources(db: AsyncSession = Depends(get_db)):
     available_resources = await resource_service.get_available_resources(db)
     if not available_resources:
@@ -41,6 +41,15 @@ async def read_available_movable_resources(start_time: str, end_time: str, db: A
     return available_resources
 
 
+@router.get("/{resource_id}", response_model=schemas.Resource,
+            dependencies=[Depends(ETag(models.Resource, key="resource_id", snapshot=True))])
+async def read_resource(resource_id: int, db: AsyncSession = Depends(get_db)):
+    resource = await resource_service.get_resource(db, resource_id)
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return resource
+
+
 @router.put("/{resource_id}", response_model=schemas.Resource)
 async def update_resource(
     resource_id: int,
@@ -61,6 +70,25 @@ async def delete_resource(resource_id: int, db: AsyncSession = Depends(get_db)):
     return deleted_resource
 
 
+@router.get("/{resource_id}/blackouts", response_model=list[schemas.ResourceBlackout])
+async def read_resource_blackouts(resource_id: int, db: AsyncSession = Depends(get_db)):
+    return await resource_service.get_resource_blackouts(db, resource_id)
+
+
+@router.post("/{resource_id}/blackouts", response_model=schemas.ResourceBlackout)
+async def create_resource_blackout(
+        resource_id: int,
+        blackout: schemas.ResourceBlackoutCreate,
+        db: AsyncSession = Depends(get_db)
+):
+    return await resource_service.create_resource_blackout(db, resource_id, blackout)
+
+
+@router.delete("/{resource_id}/blackouts/{blackout_id}", response_model=schemas.ResourceBlackout)
+async def delete_resource_blackout(resource_id: int, blackout_id: int, db: AsyncSession = Depends(get_db)):
+    return await resource_service.delete_resource_blackout(db, resource_id, blackout_id)
+
+
 @router.put("/{resource_id}/availability", response_model=schemas.Resource)
 async def update_resource_availability(
         resource_id: int,
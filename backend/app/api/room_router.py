@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List
 from backend.app.services import room_service
-from backend.app.db import schemas
+from backend.app.db import models, schemas
 from backend.app.core.dependencies import get_db
+from backend.app.core.etag import ETag
+from backend.app.core.pagination import PageParams, page_response
 
 
 router = APIRouter()
 
+room_etag = ETag(models.Room, models.Resource, models.room_fixed_resources, snapshot=True)
+
 
 @router.post("/", response_model=schemas.Room)
 async def create_room(room: schemas.RoomCreate, db: AsyncSession = Depends(get_db)):
@@ -24,11 +29,48 @@ async def read_available_rooms(start_time: datetime, end_time: datetime, db: Asy
         if not available_rooms:
             raise HTTPException(status_code=404, detail="No available rooms found")
         return available_rooms
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/{room_id}", response_model=schemas.Room)
+@router.get("/free-slots", response_model=list[schemas.FreeSlot])
+async def read_free_slots(
+    duration_minutes: int,
+    start_time: datetime,
+    end_time: datetime,
+    min_capacity: int = 0,
+    resource_ids: List[int] = Query([]),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+    if duration_minutes <= 0:
+        raise HTTPException(status_code=400, detail="Duration must be positive")
+
+    return await room_service.find_free_slots(
+        db, timedelta(minutes=duration_minutes), start_time, end_time, min_capacity, resource_ids, limit
+    )
+
+
+@router.get("/occupancy", response_model=schemas.OccupancyMatrix)
+async def read_occupancy(
+    start_time: datetime,
+    end_time: datetime,
+    bucket_minutes: int = Query(15, ge=1),
+    room_ids: List[int] = Query([]),
+    db: AsyncSession = Depends(get_db)
+):
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+
+    matrix = await room_service.get_occupancy(db, start_time, end_time, timedelta(minutes=bucket_minutes), room_ids)
+    return Response(content=matrix.model_dump_json(), media_type="application/json")
+
+
+@router.get("/{room_id}", response_model=schemas.Room, dependencies=[Depends(room_etag)])
 async def read_room(room_id: int, db: AsyncSession = Depends(get_db)):
     room = await room_service.get_room(db, room_id)
     if room is None:
@@ -37,8 +79,12 @@ async def read_room(room_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schemas.Room])
-async def read_rooms(db: AsyncSession = Depends(get_db)):
-    return await room_service.get_rooms(db)
+async def read_rooms(
+    page: PageParams = Depends(),
+    etag: str = Depends(room_etag),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(await room_service.get_rooms(db, page.cursor, page.limit), schemas.RoomList, etag)
 
 
 @router.put("/{room_id}", response_model=schemas.Room)
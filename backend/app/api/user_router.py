@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from backend.app.services import user_service
-from backend.app.db import schemas
+from backend.app.db import models, schemas
 from backend.app.core.security import create_access_token
 from backend.app.core.dependencies import get_db
+from backend.app.core.etag import ETag
+from backend.app.core.pagination import PageParams, page_response
 
 router = APIRouter()
 
@@ -33,7 +35,7 @@ async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_d
     return await user_service.create_user(db, user)
 
 
-@router.get("/{user_id}", response_model=schemas.User)
+@router.get("/{user_id}", response_model=schemas.User, dependencies=[Depends(ETag(models.User, key="user_id"))])
 async def read_user(user_id: int, db: AsyncSession = Depends(get_db)):
     user = await user_service.get_user(db, user_id)
     if user is None:
@@ -41,7 +43,8 @@ async def read_user(user_id: int, db: AsyncSession = Depends(get_db)):
     return user
 
 
-@router.get("/username/{username}", response_model=schemas.User)
+@router.get("/username/{username}", response_model=schemas.User,
+            dependencies=[Depends(ETag(models.User, key="username", column="username"))])
 async def read_user_by_username(username: str, db: AsyncSession = Depends(get_db)):
     user = await user_service.get_user_by_username(db, username)
     if user is None:
@@ -50,8 +53,12 @@ async def read_user_by_username(username: str, db: AsyncSession = Depends(get_db
 
 
 @router.get("/", response_model=list[schemas.User])
-async def read_users(db: AsyncSession = Depends(get_db)):
-    return await user_service.get_users(db)
+async def read_users(
+    page: PageParams = Depends(),
+    etag: str = Depends(ETag(models.User)),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(await user_service.get_users(db, page.cursor, page.limit), schemas.UserList, etag)
 
 
 @router.put("/{user_id}", response_model=schemas.User)
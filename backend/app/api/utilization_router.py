@@ -0,0 +1,40 @@
+from datetime import date
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.dependencies import get_current_admin_user, get_db
+from backend.app.db import schemas
+from backend.app.db.models import User
+from backend.app.services import utilization_service
+
+router = APIRouter()
+
+
+@router.get("/rooms", response_model=List[schemas.Utilization])
+async def read_room_utilization(
+    start_date: date,
+    end_date: date,
+    period: str = Query("day", pattern="^(day|week)$"),
+    room_ids: List[int] = Query([]),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must not be after end date")
+    return await utilization_service.get_utilization(db, "rooms", start_date, end_date, period, room_ids)
+
+
+@router.get("/resources", response_model=List[schemas.Utilization])
+async def read_resource_utilization(
+    start_date: date,
+    end_date: date,
+    period: str = Query("day", pattern="^(day|week)$"),
+    resource_ids: List[int] = Query([]),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must not be after end date")
+    return await utilization_service.get_utilization(db, "resources", start_date, end_date, period, resource_ids)
@@ -0,0 +1,117 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.db import models
+
+
+class CachedUser:
+    __slots__ = ("id", "username", "email", "role")
+
+    def __init__(self, user: models.User):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role = user.role
+
+
+class AuthCache:
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.tokens_by_user: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[CachedUser]:
+        entry = self.entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            self._evict(token)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: CachedUser, token_expires_at: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        self.entries[token] = (time.monotonic() + ttl, user)
+        self.entries.move_to_end(token)
+        self.tokens_by_user.setdefault(user.id, set()).add(token)
+        while len(self.entries) > self.max_size:
+            self._evict(next(iter(self.entries)))
+
+    def invalidate_user(self, user_id: int):
+        for token in self.tokens_by_user.pop(user_id, ()):
+            self.entries.pop(token, None)
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _evict(self, token: str):
+        _, user = self.entries.pop(token)
+        tokens = self.tokens_by_user.get(user.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self.tokens_by_user[user.id]
+
+
+auth_cache = AuthCache(settings.auth_cache_size, settings.auth_cache_ttl_seconds)
+
+
+async def get_user_for_token(db: AsyncSession, token: str) -> CachedUser:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        user_id_str: str = payload.get("sub")
+        if user_id_str is None:
+            raise credentials_exception
+        user_id = int(user_id_str)
+    except (JWTError, ValueError):
+        raise credentials_exception
+
+    cached_user = auth_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    result = await db.execute(select(models.User).filter(models.User.id == user_id))
+    user = result.scalars().first()
+    if user is None:
+        raise credentials_exception
+
+    cached_user = CachedUser(user)
+    auth_cache.put(token, cached_user, payload.get("exp"))
+    return cached_user
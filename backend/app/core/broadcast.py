@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+import logging
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from backend.app.core.config import settings
+from backend.app.db.init_db import engine
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 8000
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+
+
+class MemoryBroadcast:
+    def __init__(self):
+        self.handlers: Dict[str, List[Handler]] = {}
+
+    async def connect(self):
+        pass
+
+    def on_reconnect(self, handler: Callable[[], None]):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    def subscribe(self, channel: str, handler: Handler):
+        self.handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, message: str):
+        self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: str):
+        for handler in self.handlers.get(channel, ()):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Broadcast handler failed on channel %s", channel)
+
+
+class PostgresBroadcast(MemoryBroadcast):
+    def __init__(self, engine: AsyncEngine):
+        super().__init__()
+        self.engine = engine
+        self.connection: AsyncConnection = None
+        self.listener = None
+        self.reconnect_handlers: List[Callable[[], None]] = []
+        self.connected = False
+        self.reconnects = 0
+        self._reconnect_task = None
+
+    def on_reconnect(self, handler: Callable[[], None]):
+        self.reconnect_handlers.append(handler)
+
+    async def connect(self):
+        self.connected = True
+        await self._listen()
+
+    async def disconnect(self):
+        self.connected = False
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self.connection is None:
+            return
+        self.listener.remove_termination_listener(self._terminated)
+        if not self.listener.is_closed():
+            for channel in self.handlers:
+                await self.listener.remove_listener(channel, self._notify)
+        await self.connection.close()
+        self.connection = None
+        self.listener = None
+
+    def subscribe(self, channel: str, handler: Handler):
+        super().subscribe(channel, handler)
+        if self.listener is not None and len(self.handlers[channel]) == 1:
+            asyncio.get_running_loop().create_task(self.listener.add_listener(channel, self._notify))
+
+    async def publish(self, channel: str, message: str):
+        if not self.connected:
+            return self._dispatch(channel, message)
+        size = len(message.encode())
+        if size >= NOTIFY_PAYLOAD_LIMIT:
+            raise ValueError(f"Broadcast message of {size} bytes is over the {NOTIFY_PAYLOAD_LIMIT} byte NOTIFY limit")
+        # on a pooled connection, so publishers neither queue behind each other nor depend on the listener
+        async with self.engine.connect() as connection:
+            await connection.execute(text("SELECT pg_notify(:channel, :message)"),
+                                     {"channel": channel, "message": message})
+            await connection.commit()
+
+    async def _listen(self):
+        self.connection = await self.engine.connect()
+        raw_connection = await self.connection.get_raw_connection()
+        self.listener = raw_connection.driver_connection
+        self.listener.add_termination_listener(self._terminated)
+        for channel in self.handlers:
+            await self.listener.add_listener(channel, self._notify)
+
+    def _terminated(self, listener):
+        if not self.connected or listener is not self.listener:
+            return
+        logger.warning("Broadcast listener connection lost, reconnecting")
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        try:
+            await self.connection.invalidate()
+        except Exception:
+            logger.debug("Discarding the lost broadcast listener connection failed", exc_info=True)
+        self.connection = None
+        self.listener = None
+        for attempt in itertools.count():
+            try:
+                await self._listen()
+                break
+            except Exception:
+                delay = min(RECONNECT_BASE_DELAY * 2 ** attempt, RECONNECT_MAX_DELAY)
+                logger.exception("Broadcast listener reconnect failed, retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+        self.reconnects += 1
+        self._reconnect_task = None
+        logger.info("Broadcast listener reconnected")
+        # anything published while the listener was down is gone
+        for handler in self.reconnect_handlers:
+            handler()
+
+    def _notify(self, connection, pid, channel, payload):
+        self._dispatch(channel, payload)
+
+
+def create_broadcast(backend: str):
+    if backend == "memory":
+        return MemoryBroadcast()
+    if backend == "postgres":
+        return PostgresBroadcast(engine)
+    raise ValueError(f"Unknown broadcast backend: {backend}")
+
+
+broadcast = create_broadcast(settings.broadcast_backend)
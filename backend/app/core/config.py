@@ -6,6 +6,30 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    booking_exclusion_constraints: bool = False
+    availability_index: bool = False
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 256
+    password_hash_target_ms: int = 0
+    auth_cache_size: int = 10000
+    auth_cache_ttl_seconds: int = 60
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    metrics_enabled: bool = True
+    query_budget_max_repeats: int = 0
+    query_budget_raise: bool = False
+    utilization_hours_per_day: float = 24.0
+    catalog_snapshot: bool = False
+    catalog_snapshot_max_age_seconds: float = 30.0
+    broadcast_backend: str = "memory"
+    availability_queue_size: int = 256
+    booking_pipeline: bool = False
+    booking_pipeline_max_batch: int = 64
 
     class Config:
         env_file = ".env"
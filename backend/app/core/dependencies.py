@@ -1,9 +1,8 @@
 from fastapi import Depends, HTTPException, status
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi.security import OAuth2PasswordBearer
-from backend.app.core.config import settings
+from backend.app.core.auth_cache import get_user_for_token
 from backend.app.db.models import User, Appointment
 from backend.app.db.init_db import AsyncSessionLocal
 from typing import AsyncGenerator, Optional
@@ -20,25 +19,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_user_by_token(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    query = select(User).filter(User.id == int(user_id))
-    result = await db.execute(query)
-    user = result.scalars().first()
-    if user is None:
-        raise credentials_exception
-    return user
+    return await get_user_for_token(db, token)
 
 
 async def get_current_admin_user(current_user: User = Depends(get_user_by_token)):
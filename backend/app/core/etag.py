@@ -0,0 +1,69 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.core.dependencies import get_db
+from backend.app.db.init_db import read_table_versions
+from backend.app.services.catalog import catalog
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag})
+
+
+async def row_fingerprint(db: AsyncSession, model, column, value) -> Optional[tuple]:
+    result = await db.execute(select(model.id, model.created_at, model.updated_at).where(column == value))
+    row = result.first()
+    return tuple(row) if row is not None else None
+
+
+def make_etag(request: Request, fingerprint: tuple) -> str:
+    payload = f"{request.url.path}?{request.url.query}|{fingerprint!r}"
+    return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ETag:
+    def __init__(self, *tables, key: Optional[str] = None, column: str = "id", snapshot: bool = False):
+        self.names = tuple(getattr(table, "__table__", table).name for table in tables)
+        self.model = tables[0]
+        self.key = key
+        self.column = getattr(tables[0], column)
+        self.snapshot = snapshot
+
+    async def __call__(self, request: Request, response: Response,
+                       db: AsyncSession = Depends(get_db)) -> Optional[str]:
+        if self.snapshot and settings.catalog_snapshot:
+            # the body is served from the catalog snapshot, so the tag has to describe that snapshot
+            fingerprint = (await catalog.get(db, settings.catalog_snapshot_max_age_seconds)).table_versions
+        elif self.key:
+            try:
+                value = self.column.type.python_type(request.path_params[self.key])
+            except ValueError:
+                return None
+            fingerprint = await row_fingerprint(db, self.model, self.column, value)
+            if fingerprint is None:
+                return None
+        else:
+            fingerprint = await read_table_versions(db, self.names)
+
+        etag = make_etag(request, fingerprint)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise NotModified(etag)
+        response.headers["ETag"] = etag
+        return etag
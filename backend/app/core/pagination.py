@@ -0,0 +1,93 @@
+import base64
+import json
+from bisect import bisect_right
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(item, keys: List) -> str:
+    values = [getattr(item, key.key) for key in keys]
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: List) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [_decode_cursor_value(key, value) for key, value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _decode_cursor_value(key, value):
+    python_type = key.type.python_type
+    if python_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    # exact type, so a cursor can't slip a string, float or bool in where the key is an integer
+    if type(value) is not python_type:
+        raise TypeError(value)
+    return value
+
+
+async def paginate(db: AsyncSession, query, keys: List, cursor: Optional[str] = None,
+                   limit: Optional[int] = None) -> Page:
+    if cursor:
+        query = query.filter(tuple_(*keys) > tuple_(*decode_cursor(cursor, keys)))
+    query = query.order_by(*keys)
+
+    if limit is None:
+        result = await db.execute(query)
+        return Page(result.scalars().unique().all())
+
+    result = await db.execute(query.limit(limit + 1))
+    items = result.scalars().unique().all()
+    if len(items) <= limit:
+        return Page(items)
+    return Page(items[:limit], encode_cursor(items[limit - 1], keys))
+
+
+def paginate_sequence(items: Sequence, ids: Sequence, key, cursor: Optional[str] = None,
+                      limit: Optional[int] = None) -> Page:
+    start = bisect_right(ids, decode_cursor(cursor, [key])[0]) if cursor else 0
+    if limit is None:
+        return Page(list(items[start:]))
+    page = list(items[start:start + limit])
+    if start + limit >= len(items):
+        return Page(page)
+    return Page(page, encode_cursor(page[-1], [key]))
+
+
+def page_response(page: Page, adapter: TypeAdapter, etag: Optional[str] = None) -> Response:
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    if etag:
+        headers["ETag"] = etag
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(page.items, from_attributes=True)),
+        media_type="application/json",
+        headers=headers or None
+    )
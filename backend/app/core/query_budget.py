@@ -0,0 +1,91 @@
+import logging
+import os
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryLog:
+    __slots__ = ("max_repeats", "raise_on_exceed", "statements", "shapes")
+
+    def __init__(self, max_repeats: int = 0, raise_on_exceed: bool = True):
+        self.max_repeats = max_repeats
+        self.raise_on_exceed = raise_on_exceed
+        self.statements = 0
+        self.shapes: Dict[str, int] = {}
+
+    @property
+    def max_shape_repeats(self):
+        return max(self.shapes.values(), default=0)
+
+    def record(self, statement: str):
+        self.statements += 1
+        repeats = self.shapes[statement] = self.shapes.get(statement, 0) + 1
+        if self.max_repeats and repeats == self.max_repeats + 1:
+            message = f"Statement ran more than {self.max_repeats} times in one request: {statement}"
+            if self.raise_on_exceed:
+                raise QueryBudgetExceeded(message)
+            logger.warning("%s\n%s", message, "".join(_app_stack()))
+
+
+current_query_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+
+@contextmanager
+def track_queries(max_repeats: int = 0, raise_on_exceed: bool = True):
+    query_log = QueryLog(max_repeats, raise_on_exceed)
+    token = current_query_log.set(query_log)
+    try:
+        yield query_log
+    finally:
+        current_query_log.reset(token)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app, max_repeats: int, raise_on_exceed: bool = False):
+        self.app = app
+        self.max_repeats = max_repeats
+        self.raise_on_exceed = raise_on_exceed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries(self.max_repeats, self.raise_on_exceed):
+            await self.app(scope, receive, send)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_log = current_query_log.get()
+    if query_log is not None:
+        query_log.record(statement)
+
+
+def install_query_log(engine: Engine):
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _app_stack():
+    frames = traceback.extract_stack()
+    # async sessions run the cursor call in a child greenlet; the calling coroutines live on the parent's stack
+    parent = greenlet.getcurrent().parent
+    while parent is not None:
+        if parent.gr_frame is not None:
+            frames = traceback.extract_stack(parent.gr_frame) + frames
+        parent = parent.parent
+    frames = [frame for frame in frames if frame.filename.startswith(APP_DIR) and frame.filename != __file__]
+    return traceback.StackSummary.from_list(frames).format()
@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
+from jose import jwt
 from backend.app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.app.core.dependencies import get_db
-from backend.app.services import user_service
+from backend.app.core.auth_cache import get_user_for_token
 
 security = HTTPBearer()
 
@@ -20,24 +20,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 async def get_current_user(db: AsyncSession, token: str):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
-            raise credentials_exception
-        user_id = int(user_id_str)
-    except JWTError:
-        raise credentials_exception
-
-    user = await user_service.get_user(db, user_id=user_id)
-    if user is None:
-        raise credentials_exception
-    return user
+    return await get_user_for_token(db, token)
 
 
 async def get_current_admin_user(
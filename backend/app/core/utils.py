@@ -1,11 +1,107 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# calibration may only raise the cost above passlib's default, never lower it
+DEFAULT_BCRYPT_ROUNDS = pwd_context.handler("bcrypt").default_rounds
+PROBE_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 15
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.slots = asyncio.Semaphore(workers)
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    async def run(self, func, *args):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests, try again shortly"
+            )
+
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        queued_at = time.perf_counter()
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+        self.wait_seconds += time.perf_counter() - queued_at
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.slots.release()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.wait_seconds * 1000 / self.completed if self.completed else 0.0,
+            "bcrypt_rounds": pwd_context.to_dict().get("bcrypt__default_rounds", DEFAULT_BCRYPT_ROUNDS),
+        }
+
+
+password_hash_pool = PasswordHashPool(settings.password_hash_workers, settings.password_hash_max_queue)
+
+
+async def verify_password(plain_password, password_hash):
+    return await password_hash_pool.run(pwd_context.verify, plain_password, password_hash)
+
+
+async def verify_and_update_password(plain_password, password_hash):
+    return await password_hash_pool.run(pwd_context.verify_and_update, plain_password, password_hash)
+
+
+async def get_password_hash(password):
+    return await password_hash_pool.run(pwd_context.hash, password)
+
+
+def _estimate_bcrypt_rounds(target_ms: int):
+    started = time.perf_counter()
+    pwd_context.handler("bcrypt").using(rounds=PROBE_BCRYPT_ROUNDS).hash("calibration")
+    elapsed_ms = (time.perf_counter() - started) * 1000
 
-def verify_password(plain_password, password_hash):
-    return pwd_context.verify(plain_password, password_hash)
+    rounds = PROBE_BCRYPT_ROUNDS
+    while rounds < MAX_BCRYPT_ROUNDS and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
 
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def calibrate_password_hashing(target_ms: int):
+    estimated = await password_hash_pool.run(_estimate_bcrypt_rounds, target_ms)
+    if estimated < DEFAULT_BCRYPT_ROUNDS:
+        logger.warning("Password hashing target of %d ms would lower bcrypt to %d rounds; keeping the default of %d",
+                       target_ms, estimated, DEFAULT_BCRYPT_ROUNDS)
+    rounds = max(estimated, DEFAULT_BCRYPT_ROUNDS)
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+    return rounds
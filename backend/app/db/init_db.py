@@ -1,10 +1,33 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+import random
+
+from sqlalchemy import Column, Integer, String, Table, case, event, func, insert, inspect, select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from backend.app.core.config import settings
+from backend.app.db.pool import InstrumentedQueuePool
 
 DATABASE_URL = settings.database_url
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+def engine_options(database_url: str):
+    if database_url.startswith("sqlite"):
+        return {"echo": settings.db_echo}
+    options = {
+        "echo": settings.db_echo,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if database_url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -14,8 +37,172 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+# change counters for the tables served behind ETags, bumped in the same transaction as the write. Each
+# table's counter is spread over shards and its version is their sum: a writer bumps a shard no other
+# transaction holds, so concurrent bookings don't queue on one row until commit, and all of a commit's
+# tables are bumped in one statement.
+table_version_shards = Table(
+    "table_version_shards", Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("shard", Integer, primary_key=True, autoincrement=False),
+    Column("version", Integer, nullable=False, default=0)
+)
+
+TABLE_VERSION_SHARDS = 64
+
+VERSIONED_TABLES = {"users", "rooms", "resources", "room_fixed_resources", "appointments"}
+CHANGED_TABLES = "changed_tables"
+
+
+def mark_changed(session: Session, names):
+    changed = {name for name in names if name in VERSIONED_TABLES}
+    if changed:
+        session.info.setdefault(CHANGED_TABLES, set()).update(changed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_changed(orm_execute_state.session, [orm_execute_state.statement.table.name])
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_writes(session: Session, flush_context):
+    names = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        dirty = instance in session.dirty
+        if dirty and not session.is_modified(instance):
+            continue
+        state = inspect(instance)
+        names.add(state.mapper.local_table.name)
+        # link rows of a many-to-many collection are written without an object of their own
+        names.update(
+            relationship.secondary.name for relationship in state.mapper.relationships
+            if relationship.secondary is not None
+            and (not dirty or state.attrs[relationship.key].history.has_changes())
+        )
+    mark_changed(session, names)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_table_versions(session: Session):
+    session.flush()
+    changed = session.info.pop(CHANGED_TABLES, None)
+    if not changed:
+        return
+    connection = session.connection()
+    names = sorted(changed)
+    if connection.dialect.name != "postgresql":
+        # SQLite serialises writers anyway
+        connection.execute(_bump_shards(names, {name: random.randrange(TABLE_VERSION_SHARDS) for name in names}))
+        return
+    bumped = set(connection.execute(_bump_shards(names, {name: _free_shard(name) for name in names})).scalars())
+    missing = [name for name in names if name not in bumped]
+    if missing:
+        # every shared shard is held by another writer; a shard keyed by this backend's pid is never contended
+        shards = table_version_shards.c
+        statement = postgresql.insert(table_version_shards).values([
+            {"name": name, "shard": TABLE_VERSION_SHARDS + func.pg_backend_pid(), "version": 1} for name in missing
+        ])
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[shards.name, shards.shard], set_={"version": shards.version + 1}
+        ))
+
+
+def _free_shard(name: str):
+    shards = table_version_shards.c
+    return (
+        select(shards.shard).where(shards.name == name)
+        .order_by(func.random()).limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
 
-async def init_db():
+
+def _bump_shards(names: list, shard_by_name: dict):
+    shards = table_version_shards.c
+    return (
+        update(table_version_shards)
+        .where(shards.name.in_(names), shards.shard == case(shard_by_name, value=shards.name))
+        .values(version=shards.version + 1)
+        .returning(shards.name)
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_table_changes(session: Session):
+    session.info.pop(CHANGED_TABLES, None)
+
+
+async def read_table_versions(db: AsyncSession, names) -> tuple:
+    shards = table_version_shards.c
+    result = await db.execute(
+        select(shards.name, func.sum(shards.version)).where(shards.name.in_(names)).group_by(shards.name)
+    )
+    versions = dict(result.all())
+    return tuple(int(versions.get(name) or 0) for name in names)
+
+
+def create_table_version_shards(conn):
+    shards = table_version_shards.c
+    existing = set(conn.execute(select(shards.name, shards.shard)).tuples())
+    missing = [
+        {"name": name, "shard": shard, "version": 0}
+        for name in sorted(VERSIONED_TABLES) for shard in range(TABLE_VERSION_SHARDS)
+        if (name, shard) not in existing
+    ]
+    if missing:
+        conn.execute(insert(table_version_shards), missing)
+
+
+ROOM_EXCLUSION_CONSTRAINT = "appointments_room_time_range_excl"
+RESOURCE_EXCLUSION_CONSTRAINT = "resource_reservations_resource_time_range_excl"
+
+BOOKING_EXCLUSION_CONSTRAINTS = {
+    ROOM_EXCLUSION_CONSTRAINT: (
+        f"ALTER TABLE appointments ADD CONSTRAINT {ROOM_EXCLUSION_CONSTRAINT} "
+        "EXCLUDE USING gist (int4range(room_id, room_id, '[]') WITH =, tsrange(start_time, end_time) WITH &&)"
+    ),
+    RESOURCE_EXCLUSION_CONSTRAINT: (
+        f"ALTER TABLE resource_reservations ADD CONSTRAINT {RESOURCE_EXCLUSION_CONSTRAINT} "
+        "EXCLUDE USING gist (int4range(resource_id, resource_id, '[]') WITH =, tsrange(start_time, end_time) WITH &&)"
+    ),
+}
+
+
+async def init_db(db_engine: AsyncEngine = engine):
     import backend.app.db.models
-    async with engine.begin() as conn:
+    from backend.app.db.migrations import run_migrations
+    async with db_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # columns first, so migrations can rely on every declared column being there
+        await conn.run_sync(upgrade_schema)
+        await conn.run_sync(run_migrations)
+        await conn.run_sync(create_table_version_shards)
+        if settings.booking_exclusion_constraints:
+            await create_booking_exclusion_constraints(conn)
+
+
+async def create_booking_exclusion_constraints(conn: AsyncConnection):
+    result = await conn.execute(
+        text("SELECT conname FROM pg_constraint WHERE conname = ANY(:names)"),
+        {"names": list(BOOKING_EXCLUSION_CONSTRAINTS)}
+    )
+    existing = set(result.scalars().all())
+    for name, ddl in BOOKING_EXCLUSION_CONSTRAINTS.items():
+        if name not in existing:
+            await conn.execute(text(ddl))
+
+
+def upgrade_schema(conn):
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        for column in missing:
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Column, DateTime, MetaData, String, Table, cast, exists, insert, inspect, literal, null, select, text
+)
+
+from backend.app.db import models
+from backend.app.db.init_db import Base
+
+schema_migrations = Table(
+    "schema_migrations", Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime, default=datetime.utcnow)
+)
+
+
+def fold_resource_reservations(conn):
+    legacy = MetaData()
+    legacy.reflect(conn, only=lambda name, _: name in ("appointment_resources", "resource_unavailable"))
+    links = legacy.tables.get("appointment_resources")
+    unavailable = legacy.tables.get("resource_unavailable")
+    ledger = models.ResourceReservation.__table__
+    appointments = models.Appointment.__table__
+    columns = ["id", "resource_id", "kind", "appointment_id", "start_time", "end_time", "created_at"]
+
+    if links is not None:
+        # link ids are kept, so appointment resource ids handed out by the API stay valid
+        conn.execute(insert(ledger).from_select(columns, select(
+            links.c.id, links.c.resource_id, _kind(models.ReservationKind.appointment), links.c.appointment_id,
+            appointments.c.start_time, appointments.c.end_time, links.c.created_at
+        ).join(appointments, appointments.c.id == links.c.appointment_id).where(
+            links.c.resource_id.is_not(None),
+            appointments.c.start_time.is_not(None),
+            appointments.c.end_time.is_not(None)
+        )))
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('resource_reservations', 'id'), "
+                "COALESCE((SELECT MAX(id) FROM resource_reservations), 0) + 1, false)"
+            ))
+
+    if unavailable is not None:
+        blackouts = select(
+            unavailable.c.resource_id, _kind(models.ReservationKind.blackout), null(),
+            unavailable.c.start_time, unavailable.c.end_time, literal(datetime.utcnow(), DateTime)
+        ).where(
+            unavailable.c.resource_id.is_not(None),
+            unavailable.c.start_time.is_not(None),
+            unavailable.c.end_time.is_not(None)
+        )
+        if links is not None:
+            # copies of a linked appointment's times are the holds folded in above; anything else was
+            # entered by hand and becomes a blackout
+            blackouts = blackouts.where(~exists().where(
+                links.c.resource_id == unavailable.c.resource_id,
+                appointments.c.id == links.c.appointment_id,
+                appointments.c.start_time == unavailable.c.start_time,
+                appointments.c.end_time == unavailable.c.end_time
+            ))
+        conn.execute(insert(ledger).from_select(columns[1:], blackouts))
+
+    for table in (unavailable, links):
+        if table is not None:
+            table.drop(conn)
+
+
+def _kind(kind: models.ReservationKind):
+    return cast(literal(kind.name), models.ResourceReservation.kind.type)
+
+
+TIME_RANGE_INDEXES = {
+    "ix_appointments_room_window",
+    "ix_appointments_window",
+    "ix_appointments_user_start",
+    "ix_resource_reservations_resource_window",
+    "ix_resource_reservations_window",
+}
+
+
+def add_time_range_indexes(conn):
+    inspector = inspect(conn)
+    for table in (models.Appointment.__table__, models.ResourceReservation.__table__):
+        existing = {index["name"]: index["column_names"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in TIME_RANGE_INDEXES:
+                continue
+            if existing.get(index.name) == [column.name for column in index.columns]:
+                continue
+            # an index that kept its name but changed its columns is rebuilt
+            if index.name in existing:
+                index.drop(conn)
+            index.create(conn)
+        conn.execute(text(f"ANALYZE {table.name}"))
+
+
+MIGRATIONS = [
+    ("0001_resource_reservation_ledger", fold_resource_reservations),
+    ("0002_time_range_indexes", add_time_range_indexes),
+]
+
+
+def run_migrations(conn):
+    applied = set(conn.execute(select(schema_migrations.c.name)).scalars())
+    for name, migration in MIGRATIONS:
+        if name not in applied:
+            migration(conn)
+            conn.execute(insert(schema_migrations).values(name=name, applied_at=datetime.utcnow()))
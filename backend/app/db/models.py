@@ -1,11 +1,11 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Enum, Index, Table
 from sqlalchemy.orm import relationship
 from backend.app.db.init_db import Base
 from datetime import datetime
 import enum
 
 
-class Role(enum.Enum):
+class Role(str, enum.Enum):
     admin = "admin"
     user = "user"
 
@@ -19,6 +19,7 @@ class User(Base):
     password_hash = Column(String)
     role = Column(Enum(Role), default=Role.user)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 
 class ResourceType(enum.Enum):
@@ -45,6 +46,7 @@ class Room(Base):
     name = Column(String, index=True)
     capacity = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     fixed_resources = relationship("Resource", secondary=room_fixed_resources, back_populates="fixed_in_rooms")
 
@@ -57,43 +59,94 @@ class Resource(Base):
     type = Column(Enum(ResourceType))
     availability = Column(Enum(ResourceAvailability))
     created_at = Column(DateTime, default=datetime.utcnow)
-    unavailable_times = relationship("ResourceUnavailable", back_populates="resource")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    reservations = relationship("ResourceReservation", back_populates="resource")
 
     fixed_in_rooms = relationship("Room", secondary=room_fixed_resources, back_populates="fixed_resources")
 
 
-class ResourceUnavailable(Base):
-    __tablename__ = "resource_unavailable"
+class RecurrenceFrequency(enum.Enum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
+
+
+class AppointmentSeries(Base):
+    __tablename__ = "appointment_series"
 
     id = Column(Integer, primary_key=True, index=True)
-    resource_id = Column(Integer, ForeignKey('resources.id'))
-    start_time = Column(DateTime)
-    end_time = Column(DateTime)
+    room_id = Column(Integer, ForeignKey("rooms.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    frequency = Column(Enum(RecurrenceFrequency))
+    interval = Column(Integer, default=1)
+    count = Column(Integer, nullable=True)
+    until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
-    resource = relationship("Resource", back_populates="unavailable_times")
+    appointments = relationship("Appointment", back_populates="series")
 
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # end_time leads start_time so overlap checks for upcoming windows skip past bookings
+        Index("ix_appointments_room_window", "room_id", "end_time", "start_time"),
+        Index("ix_appointments_window", "end_time", "start_time"),
+        Index("ix_appointments_user_start", "user_id", "start_time", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     room_id = Column(Integer, ForeignKey("rooms.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
+    series_id = Column(Integer, ForeignKey("appointment_series.id"), nullable=True, index=True)
     start_time = Column(DateTime)
     end_time = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     room = relationship("Room")
     user = relationship("User")
+    series = relationship("AppointmentSeries", back_populates="appointments")
+
 
+class ReservationKind(enum.Enum):
+    appointment = "appointment"
+    blackout = "blackout"
 
-class AppointmentResource(Base):
-    __tablename__ = "appointment_resources"
+
+class ResourceReservation(Base):
+    __tablename__ = "resource_reservations"
+    __table_args__ = (
+        Index("ix_resource_reservations_resource_window", "resource_id", "end_time", "start_time"),
+        Index("ix_resource_reservations_window", "end_time", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    appointment_id = Column(Integer, ForeignKey("appointments.id"))
-    resource_id = Column(Integer, ForeignKey("resources.id"))
+    resource_id = Column(Integer, ForeignKey("resources.id"), nullable=False)
+    kind = Column(Enum(ReservationKind), nullable=False, default=ReservationKind.appointment)
+    # appointment holds reference their appointment and carry its times; blackouts have no appointment
+    appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=True, index=True)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     appointment = relationship("Appointment")
-    resource = relationship("Resource")
+    resource = relationship("Resource", back_populates="reservations")
+
+
+class RoomUtilization(Base):
+    __tablename__ = "room_utilization_daily"
+
+    room_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    booked_seconds = Column(Integer, default=0, nullable=False)
+    bookings = Column(Integer, default=0, nullable=False)
+
+
+class ResourceUtilization(Base):
+    __tablename__ = "resource_utilization_daily"
+
+    resource_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    booked_seconds = Column(Integer, default=0, nullable=False)
+    bookings = Column(Integer, default=0, nullable=False)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -19,6 +19,12 @@ class ResourceAvailability(str, Enum):
     unavailable = "unavailable"
 
 
+class RecurrenceFrequency(str, Enum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
+
+
 class UserBase(BaseModel):
     username: str
     email: str
@@ -47,8 +53,7 @@ class User(UserBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ResourceBase(BaseModel):
@@ -71,8 +76,20 @@ class Resource(ResourceBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResourceBlackoutCreate(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+
+class ResourceBlackout(ResourceBlackoutCreate):
+    id: int
+    resource_id: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RoomBase(BaseModel):
@@ -95,8 +112,28 @@ class Room(RoomBase):
     created_at: datetime
     fixed_resources: List[Resource] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FreeSlot(BaseModel):
+    room_id: int
+    start_time: datetime
+    end_time: datetime
+
+
+class OccupancyMatrix(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    bucket_minutes: int
+    room_ids: List[int]
+    occupancy: List[List[float]]
+
+
+class AvailabilitySubscription(BaseModel):
+    room_ids: List[int] = []
+    resource_ids: List[int] = []
+    start_time: datetime
+    end_time: datetime
 
 
 class AppointmentBase(BaseModel):
@@ -118,10 +155,50 @@ class AppointmentUpdate(AppointmentBase):
 
 class Appointment(AppointmentBase):
     id: int
+    series_id: Optional[int] = None
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AppointmentCancellation(BaseModel):
+    appointment_ids: List[int] = Field([], max_length=10000)
+    room_id: Optional[int] = None
+    user_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+
+class AppointmentCancellationSummary(BaseModel):
+    cancelled: int
+    appointment_ids: List[int]
+    room_ids: List[int]
+    released_resource_reservations: int
+
+
+class AppointmentSeriesCreate(BaseModel):
+    room_id: int
+    start_time: datetime
+    end_time: datetime
+    frequency: RecurrenceFrequency
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    resource_ids: List[int] = []
+
+
+class AppointmentSeries(BaseModel):
+    id: int
+    room_id: int
+    user_id: int
+    frequency: RecurrenceFrequency
+    interval: int
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    created_at: datetime
+    appointments: List[Appointment] = []
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AppointmentResourceBase(BaseModel):
@@ -137,5 +214,18 @@ class AppointmentResource(AppointmentResourceBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Utilization(BaseModel):
+    entity_id: int
+    period_start: date
+    booked_seconds: int
+    bookings: int
+    utilization: float
+
+
+AppointmentList = TypeAdapter(List[Appointment])
+RoomList = TypeAdapter(List[Room])
+ResourceList = TypeAdapter(List[Resource])
+UserList = TypeAdapter(List[User])
@@ -1,74 +1,98 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from backend.app.db import models, schemas
+from backend.app.services.availability_index import availability_index
+from backend.app.services.utilization_service import apply_resource_link
 from fastapi import HTTPException
 
+APPOINTMENT_HOLD = models.ResourceReservation.kind == models.ReservationKind.appointment
+
 
 async def create_appointment_resource(db: AsyncSession, appointment_resource: schemas.AppointmentResourceCreate):
-    db_appointment_resource = models.AppointmentResource(
-        appointment_id=appointment_resource.appointment_id,
-        resource_id=appointment_resource.resource_id
+    appointment = await _get_appointment(db, appointment_resource.appointment_id)
+    db_appointment_resource = models.ResourceReservation(
+        kind=models.ReservationKind.appointment,
+        appointment_id=appointment.id,
+        resource_id=appointment_resource.resource_id,
+        start_time=appointment.start_time,
+        end_time=appointment.end_time
     )
     db.add(db_appointment_resource)
+    await apply_resource_link(db, appointment_resource.appointment_id, appointment_resource.resource_id, 1)
     await db.commit()
     await db.refresh(db_appointment_resource)
+    availability_index.add_resource(db_appointment_resource.appointment_id, db_appointment_resource.resource_id)
     return db_appointment_resource
 
 
 async def get_appointment_resource(db: AsyncSession, appointment_resource_id: int):
     result = await db.execute(
-        select(models.AppointmentResource).filter(models.AppointmentResource.id == appointment_resource_id)
+        select(models.ResourceReservation).filter(
+            models.ResourceReservation.id == appointment_resource_id, APPOINTMENT_HOLD
+        )
     )
     return result.scalars().first()
 
 
 async def get_appointment_resources(db: AsyncSession, appointment_id: int):
     result = await db.execute(
-        select(models.AppointmentResource).filter(models.AppointmentResource.appointment_id == appointment_id)
+        select(models.ResourceReservation).filter(models.ResourceReservation.appointment_id == appointment_id)
     )
     return result.scalars().all()
 
 
 async def update_appointment_resource(db: AsyncSession, appointment_resource_id: int,
                                       appointment_resource: schemas.AppointmentResourceCreate):
-    result = await db.execute(
-        select(models.AppointmentResource).filter(models.AppointmentResource.id == appointment_resource_id)
-    )
-    db_appointment_resource = result.scalars().first()
+    db_appointment_resource = await get_appointment_resource(db, appointment_resource_id)
     if db_appointment_resource is None:
         raise HTTPException(status_code=404, detail="Appointment resource not found")
 
-    db_appointment_resource.appointment_id = appointment_resource.appointment_id
+    appointment = await _get_appointment(db, appointment_resource.appointment_id)
+    previous_appointment_id = db_appointment_resource.appointment_id
+    previous_resource_id = db_appointment_resource.resource_id
+    db_appointment_resource.appointment_id = appointment.id
     db_appointment_resource.resource_id = appointment_resource.resource_id
+    db_appointment_resource.start_time = appointment.start_time
+    db_appointment_resource.end_time = appointment.end_time
+    await apply_resource_link(db, previous_appointment_id, previous_resource_id, -1)
+    await apply_resource_link(db, appointment_resource.appointment_id, appointment_resource.resource_id, 1)
     await db.commit()
     await db.refresh(db_appointment_resource)
+    availability_index.remove_resource(previous_appointment_id, previous_resource_id)
+    availability_index.add_resource(db_appointment_resource.appointment_id, db_appointment_resource.resource_id)
     return db_appointment_resource
 
 
 async def delete_appointment_resource(db: AsyncSession, appointment_resource_id: int):
-    result = await db.execute(
-        select(models.AppointmentResource).filter(models.AppointmentResource.id == appointment_resource_id)
-    )
-    db_appointment_resource = result.scalars().first()
+    db_appointment_resource = await get_appointment_resource(db, appointment_resource_id)
 
     if db_appointment_resource is None:
         raise HTTPException(status_code=404, detail="Appointment resource not found")
 
     await db.execute(
-        delete(models.AppointmentResource).where(models.AppointmentResource.id == appointment_resource_id)
+        delete(models.ResourceReservation).where(models.ResourceReservation.id == appointment_resource_id)
     )
+    await apply_resource_link(db, db_appointment_resource.appointment_id, db_appointment_resource.resource_id, -1)
     await db.commit()
+    availability_index.remove_resource(db_appointment_resource.appointment_id, db_appointment_resource.resource_id)
     return db_appointment_resource
 
 
 async def get_movable_resources_for_appointment(db: AsyncSession, appointment_id: int):
     result = await db.execute(
-        select(models.AppointmentResource)
+        select(models.ResourceReservation)
         .join(models.Resource)
         .filter(
-            models.AppointmentResource.appointment_id == appointment_id,
+            models.ResourceReservation.appointment_id == appointment_id,
             models.Resource.type == models.ResourceType.movable,
             models.Resource.availability == models.ResourceAvailability.available
         )
     )
     return result.scalars().all()
+
+
+async def _get_appointment(db: AsyncSession, appointment_id: int):
+    appointment = await db.get(models.Appointment, appointment_id)
+    if appointment is None:
+        raise HTTPException(status_code=404, detail="Appointment not found")
+    return appointment
@@ -0,0 +1,190 @@
+from calendar import monthrange
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, insert, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from backend.app.db import models, schemas
+from backend.app.services.availability_events import booking_state, publish_booking_change
+from backend.app.services.availability_index import appointment_holds, availability_index
+from backend.app.services.utilization_service import apply_utilization
+
+MAX_SERIES_OCCURRENCES = 366
+
+
+def expand_series(series: schemas.AppointmentSeriesCreate) -> List[Tuple[datetime, datetime]]:
+    if series.start_time >= series.end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+    if series.interval < 1:
+        raise HTTPException(status_code=400, detail="Interval must be at least 1")
+    if (series.count is None) == (series.until is None):
+        raise HTTPException(status_code=400, detail="Exactly one of count or until must be provided")
+    if series.count is not None and not 1 <= series.count <= MAX_SERIES_OCCURRENCES:
+        raise HTTPException(status_code=400,
+                            detail=f"Count must be between 1 and {MAX_SERIES_OCCURRENCES}")
+
+    duration = series.end_time - series.start_time
+    occurrences = []
+    step = 0
+    while series.count is None or len(occurrences) < series.count:
+        start_time = _nth_occurrence(series, step)
+        step += 1
+        if start_time is None:
+            continue
+        if series.until is not None and start_time > series.until:
+            break
+        if len(occurrences) == MAX_SERIES_OCCURRENCES:
+            raise HTTPException(status_code=400,
+                                detail=f"A series cannot have more than {MAX_SERIES_OCCURRENCES} occurrences")
+        if occurrences and start_time < occurrences[-1][1]:
+            raise HTTPException(status_code=400,
+                                detail="Occurrences of the series overlap; the duration must not exceed the interval")
+        occurrences.append((start_time, start_time + duration))
+    return occurrences
+
+
+def _nth_occurrence(series: schemas.AppointmentSeriesCreate, step: int) -> Optional[datetime]:
+    if series.frequency == schemas.RecurrenceFrequency.daily:
+        return series.start_time + timedelta(days=step * series.interval)
+    if series.frequency == schemas.RecurrenceFrequency.weekly:
+        return series.start_time + timedelta(weeks=step * series.interval)
+
+    months = series.start_time.month - 1 + step * series.interval
+    year, month = series.start_time.year + months // 12, months % 12 + 1
+    if series.start_time.day > monthrange(year, month)[1]:
+        return None
+    return series.start_time.replace(year=year, month=month)
+
+
+async def find_series_conflicts(
+        db: AsyncSession,
+        room_id: int,
+        resource_ids: List[int],
+        occurrences: List[Tuple[datetime, datetime]]
+):
+    room_query = select(models.Appointment.start_time, models.Appointment.end_time).filter(
+        models.Appointment.room_id == room_id,
+        or_(*(
+            and_(models.Appointment.start_time < end_time, models.Appointment.end_time > start_time)
+            for start_time, end_time in occurrences
+        ))
+    )
+    busy_room = (await db.execute(room_query)).all()
+
+    busy_resources = []
+    if resource_ids:
+        resources_query = select(
+            models.ResourceReservation.resource_id,
+            models.ResourceReservation.start_time,
+            models.ResourceReservation.end_time
+        ).filter(
+            models.ResourceReservation.resource_id.in_(resource_ids),
+            or_(*(
+                and_(models.ResourceReservation.start_time < end_time,
+                     models.ResourceReservation.end_time > start_time)
+                for start_time, end_time in occurrences
+            ))
+        )
+        busy_resources = (await db.execute(resources_query)).all()
+
+    conflicts = []
+    for start_time, end_time in occurrences:
+        room_conflict = any(busy_start < end_time and busy_end > start_time for busy_start, busy_end in busy_room)
+        conflicting_resource_ids = sorted({
+            resource_id for resource_id, busy_start, busy_end in busy_resources
+            if busy_start < end_time and busy_end > start_time
+        })
+        if room_conflict or conflicting_resource_ids:
+            conflicts.append({
+                "start_time": start_time,
+                "end_time": end_time,
+                "room_unavailable": room_conflict,
+                "unavailable_resource_ids": conflicting_resource_ids
+            })
+    return conflicts
+
+
+async def create_appointment_series(db: AsyncSession, series: schemas.AppointmentSeriesCreate, user_id: int):
+    occurrences = expand_series(series)
+    resource_ids = list(dict.fromkeys(series.resource_ids))
+
+    conflicts = await find_series_conflicts(db, series.room_id, resource_ids, occurrences)
+    if conflicts:
+        _raise_series_conflicts(conflicts)
+
+    try:
+        db_series = models.AppointmentSeries(
+            room_id=series.room_id,
+            user_id=user_id,
+            frequency=series.frequency,
+            interval=series.interval,
+            count=series.count,
+            until=series.until
+        )
+        db.add(db_series)
+        await db.flush()
+
+        appointments_result = await db.scalars(
+            insert(models.Appointment).returning(models.Appointment),
+            [
+                {"room_id": series.room_id, "user_id": user_id, "series_id": db_series.id,
+                 "start_time": start_time, "end_time": end_time}
+                for start_time, end_time in occurrences
+            ]
+        )
+        db_appointments = sorted(appointments_result.all(), key=lambda appointment: appointment.start_time)
+
+        if resource_ids:
+            await db.execute(
+                insert(models.ResourceReservation),
+                [
+                    hold
+                    for appointment in db_appointments
+                    for hold in appointment_holds(appointment.id, appointment.start_time, appointment.end_time,
+                                                  resource_ids)
+                ]
+            )
+        await apply_utilization(
+            db,
+            [(series.room_id, appointment.start_time, appointment.end_time, 1) for appointment in db_appointments],
+            [
+                (resource_id, appointment.start_time, appointment.end_time, 1)
+                for appointment in db_appointments
+                for resource_id in resource_ids
+            ]
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        conflicts = await find_series_conflicts(db, series.room_id, resource_ids, occurrences)
+        if conflicts:
+            _raise_series_conflicts(conflicts)
+        raise
+
+    for appointment in db_appointments:
+        availability_index.add_appointment(
+            appointment.id, appointment.room_id, appointment.start_time, appointment.end_time, resource_ids
+        )
+        await publish_booking_change("created", appointment.id, booking_state(
+            appointment.room_id, appointment.start_time, appointment.end_time, resource_ids
+        ))
+    set_committed_value(db_series, "appointments", db_appointments)
+    return db_series
+
+
+def _raise_series_conflicts(conflicts: list):
+    raise HTTPException(
+        status_code=400,
+        detail={
+            "message": f"{len(conflicts)} occurrence(s) of the series are not available",
+            "conflicts": [
+                {**conflict, "start_time": conflict["start_time"].isoformat(),
+                 "end_time": conflict["end_time"].isoformat()}
+                for conflict in conflicts
+            ]
+        }
+    )
@@ -1,20 +1,49 @@
+import csv
+import io
+
+import orjson
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_
+from sqlalchemy import select, delete, insert, update, and_, or_
+from backend.app.core.config import settings
+from backend.app.core.pagination import paginate
 from backend.app.db import models, schemas
+from backend.app.db.init_db import ROOM_EXCLUSION_CONSTRAINT, RESOURCE_EXCLUSION_CONSTRAINT
+from backend.app.services.availability_events import booking_state, publish_booking_change, publish_bookings_cancelled
+from backend.app.services.availability_index import appointment_holds, availability_index
+from backend.app.services.catalog import catalog
+from backend.app.services.utilization_service import apply_utilization
 from fastapi import HTTPException
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+EXCLUSION_VIOLATION = "23P01"
+
+APPOINTMENT_PAGE_KEYS = [models.Appointment.start_time, models.Appointment.id]
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ["id", "room_id", "room_name", "user_id", "username", "start_time", "end_time", "created_at"]
+
 
 async def create_appointment(db: AsyncSession, appointment: schemas.AppointmentCreate, user_id: int):
-    overlapping_appointments_query = select(models.Appointment).filter(
-        models.Appointment.room_id == appointment.room_id,
-        models.Appointment.start_time < appointment.end_time,
-        models.Appointment.end_time > appointment.start_time
-    )
-    overlapping_result = await db.execute(overlapping_appointments_query)
-    if overlapping_result.scalars().first():
-        raise HTTPException(status_code=400, detail="Room is not available for the selected time slot")
+    resource_ids = list(dict.fromkeys(appointment.resource_ids))
+
+    if not settings.booking_exclusion_constraints:
+        overlapping_appointments_query = select(models.Appointment).filter(
+            models.Appointment.room_id == appointment.room_id,
+            models.Appointment.start_time < appointment.end_time,
+            models.Appointment.end_time > appointment.start_time
+        )
+        overlapping_result = await db.execute(overlapping_appointments_query)
+        if overlapping_result.scalars().first():
+            raise HTTPException(status_code=400, detail="Room is not available for the selected time slot")
+
+        if resource_ids:
+            conflicting_ids = await get_conflicting_resource_ids(
+                db, resource_ids, appointment.start_time, appointment.end_time
+            )
+            if conflicting_ids:
+                raise HTTPException(status_code=400, detail=_resources_unavailable_detail(conflicting_ids))
 
     db_appointment = models.Appointment(
         room_id=appointment.room_id,
@@ -22,33 +51,202 @@ async def create_appointment(db: AsyncSession, appointment: schemas.AppointmentC
         start_time=appointment.start_time,
         end_time=appointment.end_time
     )
-    db.add(db_appointment)
+    try:
+        db.add(db_appointment)
+        await db.flush()
+
+        if resource_ids:
+            await db.execute(
+                insert(models.ResourceReservation),
+                appointment_holds(db_appointment.id, appointment.start_time, appointment.end_time, resource_ids)
+            )
+        await apply_utilization(
+            db,
+            [(appointment.room_id, appointment.start_time, appointment.end_time, 1)],
+            [(resource_id, appointment.start_time, appointment.end_time, 1) for resource_id in resource_ids]
+        )
+        await db.commit()
+    except IntegrityError as e:
+        await _raise_booking_conflict(
+            db, e, resource_ids, appointment.start_time, appointment.end_time,
+            "Room is not available for the selected time slot"
+        )
+    availability_index.add_appointment(
+        db_appointment.id, db_appointment.room_id, db_appointment.start_time, db_appointment.end_time, resource_ids
+    )
+    await publish_booking_change("created", db_appointment.id, booking_state(
+        db_appointment.room_id, db_appointment.start_time, db_appointment.end_time, resource_ids
+    ))
+    return db_appointment
+
 
-    for resource_id in appointment.resource_ids:
-        unavailable_query = select(models.ResourceUnavailable).filter(
-            models.ResourceUnavailable.resource_id == resource_id,
-            models.ResourceUnavailable.start_time < appointment.end_time,
-            models.ResourceUnavailable.end_time > appointment.start_time
+async def create_appointments_batch(
+        db: AsyncSession,
+        room_id: int,
+        requests: List[Tuple[schemas.AppointmentCreate, int]]
+):
+    start_time = min(appointment.start_time for appointment, _ in requests)
+    end_time = max(appointment.end_time for appointment, _ in requests)
+    booked_result = await db.execute(
+        select(models.Appointment.start_time, models.Appointment.end_time).filter(
+            models.Appointment.room_id == room_id,
+            models.Appointment.start_time < end_time,
+            models.Appointment.end_time > start_time
         )
-        unavailable_result = await db.execute(unavailable_query)
-        if unavailable_result.scalars().first():
-            raise HTTPException(status_code=400,
-                                detail=f"Resource with ID {resource_id} is not available during the selected time slot")
-
-        db_unavailable = models.ResourceUnavailable(
-            resource_id=resource_id,
-            start_time=appointment.start_time,
-            end_time=appointment.end_time
+    )
+    room_booked = [tuple(row) for row in booked_result]
+
+    resource_ids = {resource_id for appointment, _ in requests for resource_id in appointment.resource_ids}
+    resource_booked: Dict[int, list] = {}
+    if resource_ids:
+        resource_result = await db.execute(
+            select(models.ResourceReservation.resource_id, models.ResourceReservation.start_time,
+                   models.ResourceReservation.end_time).filter(
+                models.ResourceReservation.resource_id.in_(resource_ids),
+                models.ResourceReservation.start_time < end_time,
+                models.ResourceReservation.end_time > start_time
+            )
         )
-        db.add(db_unavailable)
+        for resource_id, booked_start, booked_end in resource_result:
+            resource_booked.setdefault(resource_id, []).append((booked_start, booked_end))
+
+    results: list = [None] * len(requests)
+    winners = []
+    for i, (appointment, user_id) in enumerate(requests):
+        if _overlaps_any(room_booked, appointment.start_time, appointment.end_time):
+            results[i] = HTTPException(status_code=400, detail="Room is not available for the selected time slot")
+            continue
+        appointment_resource_ids = list(dict.fromkeys(appointment.resource_ids))
+        conflicting_ids = sorted(
+            resource_id for resource_id in appointment_resource_ids
+            if _overlaps_any(resource_booked.get(resource_id, ()), appointment.start_time, appointment.end_time)
+        )
+        if conflicting_ids:
+            results[i] = HTTPException(status_code=400, detail=_resources_unavailable_detail(conflicting_ids))
+            continue
+        room_booked.append((appointment.start_time, appointment.end_time))
+        for resource_id in appointment_resource_ids:
+            resource_booked.setdefault(resource_id, []).append((appointment.start_time, appointment.end_time))
+        winners.append((i, appointment, user_id, appointment_resource_ids))
+
+    if not winners:
+        return results
+
+    try:
+        appointments_result = await db.scalars(
+            insert(models.Appointment).returning(models.Appointment, sort_by_parameter_order=True),
+            [
+                {"room_id": room_id, "user_id": user_id, "start_time": appointment.start_time,
+                 "end_time": appointment.end_time}
+                for _, appointment, user_id, _ in winners
+            ]
+        )
+        db_appointments = appointments_result.all()
+        links = [
+            (db_appointment, resource_id)
+            for db_appointment, (_, _, _, appointment_resource_ids) in zip(db_appointments, winners)
+            for resource_id in appointment_resource_ids
+        ]
+        if links:
+            await db.execute(
+                insert(models.ResourceReservation),
+                [
+                    hold
+                    for db_appointment, resource_id in links
+                    for hold in appointment_holds(
+                        db_appointment.id, db_appointment.start_time, db_appointment.end_time, [resource_id]
+                    )
+                ]
+            )
+        await apply_utilization(
+            db,
+            [(room_id, db_appointment.start_time, db_appointment.end_time, 1) for db_appointment in db_appointments],
+            [
+                (resource_id, db_appointment.start_time, db_appointment.end_time, 1)
+                for db_appointment, resource_id in links
+            ]
+        )
+        await db.commit()
+    except IntegrityError:
+        # another writer got in between the state read and the commit; settle each winner on its own
+        await db.rollback()
+        for i, appointment, user_id, _ in winners:
+            try:
+                results[i] = await create_appointment(db, appointment, user_id)
+                # keep it loaded when a later fallback booking rolls the session back
+                db.expunge(results[i])
+            except (HTTPException, IntegrityError) as e:
+                results[i] = e
+        return results
+
+    for db_appointment, (i, _, _, appointment_resource_ids) in zip(db_appointments, winners):
+        availability_index.add_appointment(
+            db_appointment.id, room_id, db_appointment.start_time, db_appointment.end_time, appointment_resource_ids
+        )
+        await publish_booking_change("created", db_appointment.id, booking_state(
+            room_id, db_appointment.start_time, db_appointment.end_time, appointment_resource_ids
+        ))
+        results[i] = db_appointment
+    return results
+
+
+def _overlaps_any(intervals, start_time: datetime, end_time: datetime):
+    return any(booked_start < end_time and booked_end > start_time for booked_start, booked_end in intervals)
 
-        db_appointment_resource = models.AppointmentResource(
-            appointment_id=db_appointment.id,
-            resource_id=resource_id
+
+async def _raise_booking_conflict(
+        db: AsyncSession,
+        error: IntegrityError,
+        resource_ids: List[int],
+        start_time: datetime,
+        end_time: datetime,
+        room_detail: str,
+        **conflict_filters
+):
+    await db.rollback()
+    if getattr(error.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+        raise error
+    constraint_name = getattr(error.orig.__cause__, "constraint_name", None)
+    if constraint_name == ROOM_EXCLUSION_CONSTRAINT:
+        raise HTTPException(status_code=400, detail=room_detail)
+    if constraint_name == RESOURCE_EXCLUSION_CONSTRAINT:
+        conflicting_ids = await get_conflicting_resource_ids(db, resource_ids, start_time, end_time, **conflict_filters)
+        raise HTTPException(status_code=400, detail=_resources_unavailable_detail(conflicting_ids or resource_ids))
+    raise error
+
+
+async def get_conflicting_resource_ids(
+        db: AsyncSession,
+        resource_ids: List[int],
+        start_time: datetime,
+        end_time: datetime,
+        exclude_appointment_id: Optional[int] = None
+):
+    query = (
+        select(models.ResourceReservation.resource_id)
+        .filter(
+            models.ResourceReservation.resource_id.in_(resource_ids),
+            models.ResourceReservation.start_time < end_time,
+            models.ResourceReservation.end_time > start_time
         )
-        db.add(db_appointment_resource)
-    await db.commit()
-    return db_appointment
+        .distinct()
+        .order_by(models.ResourceReservation.resource_id)
+    )
+    if exclude_appointment_id is not None:
+        # an appointment's own holds move with it rather than conflict
+        query = query.filter(or_(
+            models.ResourceReservation.appointment_id.is_(None),
+            models.ResourceReservation.appointment_id != exclude_appointment_id
+        ))
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def _resources_unavailable_detail(resource_ids: List[int]):
+    if len(resource_ids) == 1:
+        return f"Resource with ID {resource_ids[0]} is not available during the selected time slot"
+    ids = ", ".join(str(resource_id) for resource_id in resource_ids)
+    return f"Resources with IDs {ids} are not available during the selected time slot"
 
 
 async def get_appointment(db: AsyncSession, appointment_id: int):
@@ -58,12 +256,16 @@ async def get_appointment(db: AsyncSession, appointment_id: int):
     return result.scalars().first()
 
 
-async def get_appointments(db: AsyncSession, user_id: Optional[int] = None):
+async def get_appointments(
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+):
     query = select(models.Appointment)
     if user_id:
         query = query.filter(models.Appointment.user_id == user_id)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, APPOINTMENT_PAGE_KEYS, cursor, limit)
 
 
 async def update_appointment(db: AsyncSession, appointment_id: int, appointment: schemas.AppointmentUpdate):
@@ -74,111 +276,213 @@ async def update_appointment(db: AsyncSession, appointment_id: int, appointment:
     if not db_appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    if appointment.room_id and appointment.room_id != db_appointment.room_id:
-        overlapping_appointments_query = select(models.Appointment).filter(
-            models.Appointment.room_id == appointment.room_id,
-            models.Appointment.start_time < appointment.end_time,
-            models.Appointment.end_time > appointment.start_time
+    previous_booking = (db_appointment.room_id, db_appointment.start_time, db_appointment.end_time)
+    _, previous_start, previous_end = previous_booking
+    current_resources_result = await db.execute(
+        select(models.ResourceReservation.resource_id).filter(
+            models.ResourceReservation.appointment_id == appointment_id
         )
-        overlapping_result = await db.execute(overlapping_appointments_query)
-        if overlapping_result.scalars().first():
-            raise HTTPException(status_code=400, detail="New room is not available for the selected time slot")
-
-        db_appointment.room_id = appointment.room_id
-
-    db_appointment.start_time = appointment.start_time or db_appointment.start_time
-    db_appointment.end_time = appointment.end_time or db_appointment.end_time
-
-    await db.commit()
-
-    current_resources_query = select(models.AppointmentResource).filter(
-        models.AppointmentResource.appointment_id == db_appointment.id
     )
-    current_resources_result = await db.execute(current_resources_query)
-    current_resources = {ar.resource_id for ar in current_resources_result.scalars().all()}
+    current_resources = set(current_resources_result.scalars().all())
 
-    new_resources = set(appointment.resource_ids) if appointment.resource_ids else set()
-    resources_to_add = new_resources - current_resources
+    room_id = appointment.room_id or db_appointment.room_id
+    start_time = appointment.start_time or db_appointment.start_time
+    end_time = appointment.end_time or db_appointment.end_time
+    booking = (room_id, start_time, end_time)
+    moved = (start_time, end_time) != (previous_start, previous_end)
 
-    for resource_id in resources_to_add:
-        unavailable_query = select(models.ResourceUnavailable).filter(
-            models.ResourceUnavailable.resource_id == resource_id,
-            models.ResourceUnavailable.start_time < db_appointment.end_time,
-            models.ResourceUnavailable.end_time > db_appointment.start_time
-        )
-        unavailable_result = await db.execute(unavailable_query)
-        if unavailable_result.scalars().first():
-            raise HTTPException(status_code=400,
-                                detail=f"Resource with ID {resource_id} is not available during the selected time slot")
-
-        db_unavailable = models.ResourceUnavailable(
-            resource_id=resource_id,
-            start_time=db_appointment.start_time,
-            end_time=db_appointment.end_time
-        )
-        db.add(db_unavailable)
+    new_resources = set(appointment.resource_ids) if appointment.resource_ids is not None else current_resources
+    resources_to_add = new_resources - current_resources
+    resources_to_remove = current_resources - new_resources
+    resources_to_keep = current_resources & new_resources
+    resources_to_check = resources_to_add | (resources_to_keep if moved else set())
+
+    if not settings.booking_exclusion_constraints:
+        if booking != previous_booking:
+            overlapping_result = await db.execute(
+                select(models.Appointment.id).filter(
+                    models.Appointment.room_id == room_id,
+                    models.Appointment.id != appointment_id,
+                    models.Appointment.start_time < end_time,
+                    models.Appointment.end_time > start_time
+                ).limit(1)
+            )
+            if overlapping_result.first():
+                raise HTTPException(status_code=400, detail="New room is not available for the selected time slot")
+        if resources_to_check:
+            conflicting_ids = await get_conflicting_resource_ids(
+                db, list(resources_to_check), start_time, end_time, exclude_appointment_id=appointment_id
+            )
+            if conflicting_ids:
+                raise HTTPException(status_code=400, detail=_resources_unavailable_detail(conflicting_ids))
+
+    try:
+        own_holds = models.ResourceReservation.appointment_id == appointment_id
+        if resources_to_remove:
+            await db.execute(
+                delete(models.ResourceReservation).where(
+                    own_holds, models.ResourceReservation.resource_id.in_(resources_to_remove)
+                )
+            )
+        if resources_to_keep and moved:
+            await db.execute(
+                update(models.ResourceReservation).where(own_holds).values(start_time=start_time, end_time=end_time)
+            )
+        if resources_to_add:
+            await db.execute(
+                insert(models.ResourceReservation),
+                appointment_holds(appointment_id, start_time, end_time, sorted(resources_to_add))
+            )
 
-        db_appointment_resource = models.AppointmentResource(
-            appointment_id=db_appointment.id,
-            resource_id=resource_id
+        room_bookings = [(*previous_booking, -1), (*booking, 1)] if booking != previous_booking else []
+        resource_bookings = [(resource_id, previous_start, previous_end, -1) for resource_id in resources_to_remove]
+        resource_bookings += [(resource_id, start_time, end_time, 1) for resource_id in resources_to_add]
+        if moved:
+            resource_bookings += [(resource_id, previous_start, previous_end, -1) for resource_id in resources_to_keep]
+            resource_bookings += [(resource_id, start_time, end_time, 1) for resource_id in resources_to_keep]
+        await apply_utilization(db, room_bookings, resource_bookings)
+
+        db_appointment.room_id = room_id
+        db_appointment.start_time = start_time
+        db_appointment.end_time = end_time
+        await db.commit()
+    except IntegrityError as e:
+        await _raise_booking_conflict(
+            db, e, sorted(resources_to_check), start_time, end_time,
+            "New room is not available for the selected time slot", exclude_appointment_id=appointment_id
         )
-        db.add(db_appointment_resource)
 
-    await db.commit()
-    await db.refresh(db_appointment)
+    availability_index.move_appointment(appointment_id, room_id, start_time, end_time)
+    for resource_id in resources_to_remove:
+        availability_index.remove_resource(appointment_id, resource_id)
+    for resource_id in resources_to_add:
+        availability_index.add_resource(appointment_id, resource_id)
+    await publish_booking_change(
+        "updated",
+        appointment_id,
+        booking_state(room_id, start_time, end_time, new_resources),
+        booking_state(*previous_booking, current_resources)
+    )
     return db_appointment
 
 
 async def delete_appointment(
         db: AsyncSession,
-        appointment_id: int
+        appointment_id: int,
+        db_appointment: Optional[models.Appointment] = None
 ):
-    query = select(models.Appointment).filter(models.Appointment.id == appointment_id)
-    result = await db.execute(query)
-    db_appointment = result.scalars().first()
-
+    if db_appointment is None:
+        db_appointment = await get_appointment(db, appointment_id)
     if not db_appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    resources_query = select(models.AppointmentResource).filter(
-        models.AppointmentResource.appointment_id == appointment_id
-    )
-    resources_result = await db.execute(resources_query)
-    appointment_resources = resources_result.scalars().all()
-
-    for appointment_resource in appointment_resources:
-        await db.execute(
-            delete(models.ResourceUnavailable).where(
-                models.ResourceUnavailable.resource_id == appointment_resource.resource_id,
-                models.ResourceUnavailable.start_time == db_appointment.start_time,
-                models.ResourceUnavailable.end_time == db_appointment.end_time
-            )
-        )
+    _, resources = await _delete_appointments(db, models.Appointment.id == appointment_id)
+    await db.commit()
+    availability_index.remove_appointment(appointment_id)
+    if resources:
+        catalog.bump()
+    await publish_booking_change("deleted", appointment_id, booking_state(
+        db_appointment.room_id, db_appointment.start_time, db_appointment.end_time,
+        resources.get(appointment_id, [])
+    ))
 
-        resource_query = select(models.Resource).filter(models.Resource.id == appointment_resource.resource_id)
-        resource_result = await db.execute(resource_query)
-        db_resource = resource_result.scalars().first()
-        if db_resource:
-            db_resource.availability = models.ResourceAvailability.available
-            db.add(db_resource)
+    return db_appointment
 
-    await db.execute(
-        delete(models.AppointmentResource).where(models.AppointmentResource.appointment_id == appointment_id)
-    )
 
-    await db.delete(db_appointment)
+async def cancel_appointments(db: AsyncSession, cancellation: schemas.AppointmentCancellation):
+    conditions = []
+    if cancellation.appointment_ids:
+        conditions.append(models.Appointment.id.in_(set(cancellation.appointment_ids)))
+    if cancellation.room_id:
+        conditions.append(models.Appointment.room_id == cancellation.room_id)
+    if cancellation.user_id:
+        conditions.append(models.Appointment.user_id == cancellation.user_id)
+    if cancellation.start_time:
+        conditions.append(models.Appointment.end_time > cancellation.start_time)
+    if cancellation.end_time:
+        conditions.append(models.Appointment.start_time < cancellation.end_time)
+    if not conditions:
+        raise HTTPException(status_code=400, detail="At least one cancellation filter is required")
+
+    deleted, resources = await _delete_appointments(db, and_(*conditions))
     await db.commit()
 
-    return db_appointment
+    for appointment_id, _, _, _ in deleted:
+        availability_index.remove_appointment(appointment_id)
+    if resources:
+        catalog.bump()
+    await publish_bookings_cancelled([
+        (appointment_id, booking_state(room_id, start_time, end_time, resources.get(appointment_id, [])))
+        for appointment_id, room_id, start_time, end_time in deleted
+    ])
+    return schemas.AppointmentCancellationSummary(
+        cancelled=len(deleted),
+        appointment_ids=sorted(appointment_id for appointment_id, _, _, _ in deleted),
+        room_ids=sorted({room_id for _, room_id, _, _ in deleted}),
+        released_resource_reservations=sum(len(resource_ids) for resource_ids in resources.values())
+    )
+
+
+async def _delete_appointments(db: AsyncSession, condition):
+    holds = models.ResourceReservation
+    matching_ids = select(models.Appointment.id).where(condition)
+
+    await db.execute(
+        update(models.Resource)
+        .where(models.Resource.id.in_(select(holds.resource_id).where(holds.appointment_id.in_(matching_ids))))
+        .values(availability=models.ResourceAvailability.available)
+        .execution_options(synchronize_session=False)
+    )
+    holds_result = await db.execute(
+        delete(holds)
+        .where(holds.appointment_id.in_(matching_ids))
+        .returning(holds.appointment_id, holds.resource_id)
+        .execution_options(synchronize_session=False)
+    )
+    resources: Dict[int, List[int]] = {}
+    for appointment_id, resource_id in holds_result:
+        resources.setdefault(appointment_id, []).append(resource_id)
+
+    appointments_result = await db.execute(
+        delete(models.Appointment)
+        .where(condition)
+        .returning(models.Appointment.id, models.Appointment.room_id, models.Appointment.start_time,
+                   models.Appointment.end_time)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = [tuple(row) for row in appointments_result]
+    windows = {appointment_id: (start_time, end_time) for appointment_id, _, start_time, end_time in deleted}
+
+    await apply_utilization(
+        db,
+        [(room_id, start_time, end_time, -1) for _, room_id, start_time, end_time in deleted],
+        [
+            (resource_id, *windows[appointment_id], -1)
+            for appointment_id, resource_ids in resources.items() if appointment_id in windows
+            for resource_id in resource_ids
+        ]
+    )
+    return deleted, resources
 
 
 async def get_appointments_by_filters(
         db: AsyncSession,
         room_id: Optional[int] = None,
         start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+):
+    query = _filter_appointments(select(models.Appointment), room_id, start_time, end_time)
+    return await paginate(db, query, APPOINTMENT_PAGE_KEYS, cursor, limit)
+
+
+def _filter_appointments(
+        query,
+        room_id: Optional[int] = None,
+        start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None
 ):
-    query = select(models.Appointment)
     if room_id:
         query = query.filter(models.Appointment.room_id == room_id)
     if start_time and end_time:
@@ -188,5 +492,46 @@ async def get_appointments_by_filters(
                 models.Appointment.end_time <= end_time
             )
         )
-    result = await db.execute(query)
-    return result.scalars().all()
+    return query
+
+
+async def export_appointments(
+        db: AsyncSession,
+        export_format: str,
+        room_id: Optional[int] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+):
+    query = _filter_appointments(
+        select(
+            models.Appointment.id,
+            models.Appointment.room_id,
+            models.Room.name.label("room_name"),
+            models.Appointment.user_id,
+            models.User.username,
+            models.Appointment.start_time,
+            models.Appointment.end_time,
+            models.Appointment.created_at
+        )
+        .outerjoin(models.Room, models.Room.id == models.Appointment.room_id)
+        .outerjoin(models.User, models.User.id == models.Appointment.user_id),
+        room_id, start_time, end_time
+    ).order_by(*APPOINTMENT_PAGE_KEYS)
+
+    if export_format == "csv":
+        yield _csv_chunk([EXPORT_COLUMNS])
+
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for rows in result.partitions():
+        if export_format == "csv":
+            yield _csv_chunk(rows)
+        else:
+            yield b"".join(orjson.dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return buffer.getvalue().encode()
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+
+from backend.app.core.broadcast import broadcast
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_CHANNEL = "availability"
+BULK_EVENT_SIZE = 40
+RESOURCE_IDS_PER_EVENT = 300
+
+
+class Subscription:
+    __slots__ = ("queue", "room_ids", "resource_ids", "start_time", "end_time", "overflowed")
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.room_ids: Set[int] = set()
+        self.resource_ids: Set[int] = set()
+        self.start_time: Optional[datetime] = None
+        self.end_time: Optional[datetime] = None
+        self.overflowed = False
+
+    def send(self, message: Optional[str]):
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            # a client that cannot keep up is closed and expected to resync, rather than buffering without bound
+            self.close()
+            return False
+
+    def close(self):
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class AvailabilityHub:
+    def __init__(self):
+        self.rooms: Dict[int, Set[Subscription]] = {}
+        self.resources: Dict[int, Set[Subscription]] = {}
+        self.subscriptions: Set[Subscription] = set()
+        self.events = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    def subscribe(self, subscription: Subscription, room_ids: Iterable[int], resource_ids: Iterable[int],
+                  start_time: datetime, end_time: datetime):
+        self.unsubscribe(subscription)
+        subscription.room_ids = set(room_ids)
+        subscription.resource_ids = set(resource_ids)
+        subscription.start_time = start_time
+        subscription.end_time = end_time
+        for room_id in subscription.room_ids:
+            self.rooms.setdefault(room_id, set()).add(subscription)
+        for resource_id in subscription.resource_ids:
+            self.resources.setdefault(resource_id, set()).add(subscription)
+        self.subscriptions.add(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription not in self.subscriptions:
+            return
+        self.subscriptions.discard(subscription)
+        _discard(self.rooms, subscription.room_ids, subscription)
+        _discard(self.resources, subscription.resource_ids, subscription)
+
+    def dispatch(self, message: str):
+        event = orjson.loads(message)
+        self.events += 1
+        matched = set()
+        for booking in (event.get("booking"), event.get("previous"), *event.get("bookings", ())):
+            if booking is None:
+                continue
+            start_time = datetime.fromisoformat(booking["start_time"])
+            end_time = datetime.fromisoformat(booking["end_time"])
+            candidates = [self.rooms.get(booking["room_id"], ())]
+            candidates.extend(self.resources.get(resource_id, ()) for resource_id in booking["resource_ids"])
+            for subscriptions in candidates:
+                for subscription in subscriptions:
+                    if subscription.start_time < end_time and subscription.end_time > start_time:
+                        matched.add(subscription)
+
+        for subscription in matched:
+            if subscription.send(message):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    def resync(self):
+        # events may have been missed, so every subscriber is closed and expected to resubscribe
+        for subscription in list(self.subscriptions):
+            self.unsubscribe(subscription)
+            subscription.close()
+        self.resyncs += 1
+
+    def stats(self):
+        return {
+            "subscriptions": len(self.subscriptions),
+            "rooms": len(self.rooms),
+            "resources": len(self.resources),
+            "events": self.events,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs,
+        }
+
+
+def _discard(index: Dict[int, Set[Subscription]], keys: Iterable[int], subscription: Subscription):
+    for key in keys:
+        subscriptions = index.get(key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del index[key]
+
+
+def booking_state(room_id: int, start_time: datetime, end_time: datetime, resource_ids: Iterable[int]):
+    return {
+        "room_id": room_id,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "resource_ids": sorted(resource_ids),
+    }
+
+
+async def publish_booking_change(action: str, appointment_id: int, booking: dict, previous: Optional[dict] = None):
+    # a booking holding many resources is split across messages, like a bulk cancellation, so each stays
+    # within a NOTIFY payload; every part carries the room and times, so it routes on its own
+    resource_count = max(len(booking["resource_ids"]), len(previous["resource_ids"]) if previous else 0)
+    parts = max(1, -(-resource_count // RESOURCE_IDS_PER_EVENT))
+    for part in range(parts):
+        ids = slice(part * RESOURCE_IDS_PER_EVENT, (part + 1) * RESOURCE_IDS_PER_EVENT)
+        event = {
+            "type": f"appointment.{action}",
+            "appointment_id": appointment_id,
+            "booking": {**booking, "resource_ids": booking["resource_ids"][ids]},
+            "previous": {**previous, "resource_ids": previous["resource_ids"][ids]} if previous else None,
+        }
+        if parts > 1:
+            event.update(part=part + 1, parts=parts)
+        try:
+            await broadcast.publish(AVAILABILITY_CHANNEL, orjson.dumps(event).decode())
+        except Exception:
+            logger.exception("Failed to publish availability change for appointment %s", appointment_id)
+
+
+async def publish_bookings_cancelled(bookings: List[Tuple[int, dict]]):
+    # chunked so a large cancellation stays within a NOTIFY payload and costs one message per chunk
+    for i in range(0, len(bookings), BULK_EVENT_SIZE):
+        message = orjson.dumps({
+            "type": "appointments.cancelled",
+            "bookings": [
+                {"appointment_id": appointment_id, **booking}
+                for appointment_id, booking in bookings[i:i + BULK_EVENT_SIZE]
+            ],
+        }).decode()
+        try:
+            await broadcast.publish(AVAILABILITY_CHANNEL, message)
+        except Exception:
+            logger.exception("Failed to publish availability change for %d cancelled appointments",
+                             len(bookings[i:i + BULK_EVENT_SIZE]))
+
+
+availability_hub = AvailabilityHub()
+broadcast.subscribe(AVAILABILITY_CHANNEL, availability_hub.dispatch)
+broadcast.on_reconnect(availability_hub.resync)
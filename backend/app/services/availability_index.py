@@ -0,0 +1,229 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db import models
+
+
+class IntervalSet:
+    __slots__ = ("starts", "ends", "keys", "max_ends")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.keys: List[int] = []
+        self.max_ends: List[datetime] = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key: int, start: datetime, end: datetime):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.keys.insert(i, key)
+        self.max_ends.insert(i, end)
+        self._refresh_max_ends(i)
+
+    def remove(self, key: int, start: datetime):
+        for i in range(bisect_left(self.starts, start), bisect_right(self.starts, start)):
+            if self.keys[i] == key:
+                del self.starts[i], self.ends[i], self.keys[i], self.max_ends[i]
+                self._refresh_max_ends(i)
+                return True
+        return False
+
+    def overlaps(self, start: datetime, end: datetime):
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+    def _refresh_max_ends(self, i: int):
+        running = self.max_ends[i - 1] if i > 0 else None
+        for j in range(i, len(self.ends)):
+            if running is None or self.ends[j] > running:
+                running = self.ends[j]
+            if j > i and self.max_ends[j] == running:
+                break
+            self.max_ends[j] = running
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self.rooms: Dict[int, IntervalSet] = {}
+        self.resources: Dict[int, IntervalSet] = {}
+        self.appointments: Dict[int, Tuple[int, datetime, datetime, Set[int]]] = {}
+        self.loaded = False
+
+    async def load(self, db: AsyncSession):
+        self.rooms.clear()
+        self.resources.clear()
+        self.appointments.clear()
+
+        appointments_result = await db.execute(
+            select(
+                models.Appointment.id,
+                models.Appointment.room_id,
+                models.Appointment.start_time,
+                models.Appointment.end_time
+            )
+        )
+        for appointment_id, room_id, start_time, end_time in appointments_result:
+            self._add(appointment_id, room_id, start_time, end_time, ())
+
+        reservations_result = await db.execute(
+            select(
+                models.ResourceReservation.id,
+                models.ResourceReservation.kind,
+                models.ResourceReservation.appointment_id,
+                models.ResourceReservation.resource_id,
+                models.ResourceReservation.start_time,
+                models.ResourceReservation.end_time
+            )
+        )
+        for reservation_id, kind, appointment_id, resource_id, start_time, end_time in reservations_result:
+            if kind == models.ReservationKind.blackout:
+                self._add_blackout(reservation_id, resource_id, start_time, end_time)
+            else:
+                self._add_resource(appointment_id, resource_id)
+
+        self.loaded = True
+
+    def add_appointment(self, appointment_id: int, room_id: int, start_time: datetime, end_time: datetime,
+                        resource_ids: Iterable[int] = ()):
+        if self.loaded:
+            self._remove(appointment_id)
+            self._add(appointment_id, room_id, start_time, end_time, resource_ids)
+
+    def move_appointment(self, appointment_id: int, room_id: int, start_time: datetime, end_time: datetime):
+        if self.loaded:
+            resource_ids = self._remove(appointment_id)
+            self._add(appointment_id, room_id, start_time, end_time, resource_ids)
+
+    def remove_appointment(self, appointment_id: int):
+        if self.loaded:
+            self._remove(appointment_id)
+
+    def add_resource(self, appointment_id: int, resource_id: int):
+        if self.loaded:
+            self._add_resource(appointment_id, resource_id)
+
+    def remove_resource(self, appointment_id: int, resource_id: int):
+        if not self.loaded or appointment_id not in self.appointments:
+            return
+        _, start_time, _, resource_ids = self.appointments[appointment_id]
+        if resource_id in resource_ids:
+            resource_ids.discard(resource_id)
+            self.resources[resource_id].remove(appointment_id, start_time)
+
+    def add_blackout(self, reservation_id: int, resource_id: int, start_time: datetime, end_time: datetime):
+        if self.loaded:
+            self._add_blackout(reservation_id, resource_id, start_time, end_time)
+
+    def remove_blackout(self, reservation_id: int, resource_id: int, start_time: datetime):
+        intervals = self.resources.get(resource_id)
+        if self.loaded and intervals is not None:
+            intervals.remove(-reservation_id, start_time)
+
+    def is_room_free(self, room_id: int, start_time: datetime, end_time: datetime):
+        intervals = self.rooms.get(room_id)
+        return intervals is None or not intervals.overlaps(start_time, end_time)
+
+    def is_resource_free(self, resource_id: int, start_time: datetime, end_time: datetime):
+        intervals = self.resources.get(resource_id)
+        return intervals is None or not intervals.overlaps(start_time, end_time)
+
+    def busy_room_ids(self, start_time: datetime, end_time: datetime):
+        return {room_id for room_id, intervals in self.rooms.items() if intervals.overlaps(start_time, end_time)}
+
+    def busy_resource_ids(self, start_time: datetime, end_time: datetime):
+        return {
+            resource_id for resource_id, intervals in self.resources.items()
+            if intervals.overlaps(start_time, end_time)
+        }
+
+    def _add(self, appointment_id: int, room_id: int, start_time: datetime, end_time: datetime,
+             resource_ids: Iterable[int]):
+        if room_id is None or start_time is None or end_time is None:
+            return
+        self.appointments[appointment_id] = (room_id, start_time, end_time, set())
+        self.rooms.setdefault(room_id, IntervalSet()).add(appointment_id, start_time, end_time)
+        for resource_id in resource_ids:
+            self._add_resource(appointment_id, resource_id)
+
+    def _remove(self, appointment_id: int):
+        entry = self.appointments.pop(appointment_id, None)
+        if entry is None:
+            return set()
+        room_id, start_time, _, resource_ids = entry
+        self.rooms[room_id].remove(appointment_id, start_time)
+        for resource_id in resource_ids:
+            self.resources[resource_id].remove(appointment_id, start_time)
+        return resource_ids
+
+    def _add_resource(self, appointment_id: int, resource_id: int):
+        entry = self.appointments.get(appointment_id)
+        if entry is None or resource_id in entry[3]:
+            return
+        _, start_time, end_time, resource_ids = entry
+        resource_ids.add(resource_id)
+        self.resources.setdefault(resource_id, IntervalSet()).add(appointment_id, start_time, end_time)
+
+    def _add_blackout(self, reservation_id: int, resource_id: int, start_time: datetime, end_time: datetime):
+        # blackouts share the resource's interval set with appointments, keyed apart by sign
+        self.resources.setdefault(resource_id, IntervalSet()).add(-reservation_id, start_time, end_time)
+
+
+availability_index = AvailabilityIndex()
+
+
+def busy_room_ids_query(start_time: datetime, end_time: datetime):
+    return (
+        select(models.Appointment.room_id)
+        .filter(
+            models.Appointment.start_time < end_time,
+            models.Appointment.end_time > start_time
+        )
+    )
+
+
+def busy_resource_ids_query(start_time: datetime, end_time: datetime):
+    return (
+        select(models.ResourceReservation.resource_id)
+        .filter(
+            models.ResourceReservation.start_time < end_time,
+            models.ResourceReservation.end_time > start_time
+        )
+    )
+
+
+def appointment_holds(appointment_id: int, start_time: datetime, end_time: datetime, resource_ids: Iterable[int]):
+    return [
+        {"resource_id": resource_id, "kind": models.ReservationKind.appointment, "appointment_id": appointment_id,
+         "start_time": start_time, "end_time": end_time}
+        for resource_id in resource_ids
+    ]
+
+
+async def find_index_mismatches(db: AsyncSession, start_time: datetime, end_time: datetime,
+                                index: AvailabilityIndex = availability_index):
+    rooms_result = await db.execute(busy_room_ids_query(start_time, end_time).distinct())
+    resources_result = await db.execute(busy_resource_ids_query(start_time, end_time).distinct())
+    expected = {
+        "rooms": set(rooms_result.scalars().all()),
+        "resources": set(resources_result.scalars().all())
+    }
+    actual = {
+        "rooms": index.busy_room_ids(start_time, end_time),
+        "resources": index.busy_resource_ids(start_time, end_time)
+    }
+    return {
+        kind: {
+            "missing": sorted(expected[kind] - actual[kind]),
+            "unexpected": sorted(actual[kind] - expected[kind])
+        }
+        for kind in expected
+        if expected[kind] != actual[kind]
+    }
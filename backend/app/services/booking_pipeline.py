@@ -0,0 +1,98 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from backend.app.core.config import settings
+from backend.app.db import schemas
+from backend.app.db.init_db import AsyncSessionLocal
+from backend.app.services import appointment_service
+
+
+class PendingBooking:
+    __slots__ = ("kind", "appointment", "user_id", "appointment_id", "future")
+
+    def __init__(self, kind: str, appointment, user_id: Optional[int] = None, appointment_id: Optional[int] = None):
+        self.kind = kind
+        self.appointment = appointment
+        self.user_id = user_id
+        self.appointment_id = appointment_id
+        self.future: Optional[asyncio.Future] = None
+
+
+class BookingPipeline:
+    def __init__(self, max_batch: int):
+        self.max_batch = max_batch
+        self.queues: Dict[int, Deque[PendingBooking]] = {}
+        self.workers: Dict[int, asyncio.Task] = {}
+        self.batches = 0
+        self.bookings = 0
+        self.largest_batch = 0
+
+    async def create(self, appointment: schemas.AppointmentCreate, user_id: int):
+        return await self._submit(appointment.room_id, PendingBooking("create", appointment, user_id=user_id))
+
+    async def update(self, room_id: int, appointment_id: int, appointment: schemas.AppointmentUpdate):
+        return await self._submit(room_id, PendingBooking("update", appointment, appointment_id=appointment_id))
+
+    def _submit(self, room_id: int, pending: PendingBooking) -> asyncio.Future:
+        pending.future = asyncio.get_running_loop().create_future()
+        queue = self.queues.get(room_id)
+        if queue is None:
+            queue = self.queues[room_id] = deque()
+            self.workers[room_id] = asyncio.create_task(self._drain(room_id, queue))
+        queue.append(pending)
+        return pending.future
+
+    async def _drain(self, room_id: int, queue: Deque[PendingBooking]):
+        try:
+            while queue:
+                # creates are checked and committed together; an update runs on its own so the creates
+                # queued behind it see its result
+                batch = [queue.popleft()]
+                while batch[0].kind == "create" and queue and queue[0].kind == "create" and len(batch) < self.max_batch:
+                    batch.append(queue.popleft())
+                await self._run(room_id, batch)
+        finally:
+            del self.queues[room_id]
+            del self.workers[room_id]
+
+    async def _run(self, room_id: int, batch: list):
+        try:
+            async with AsyncSessionLocal() as db:
+                if batch[0].kind == "update":
+                    results = [await appointment_service.update_appointment(
+                        db, batch[0].appointment_id, batch[0].appointment
+                    )]
+                else:
+                    results = await appointment_service.create_appointments_batch(
+                        db, room_id, [(pending.appointment, pending.user_id) for pending in batch]
+                    )
+        except Exception as e:
+            results = [e] * len(batch)
+
+        self.batches += 1
+        self.bookings += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for pending, result in zip(batch, results):
+            if pending.future.done():
+                continue
+            if isinstance(result, Exception):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
+
+    async def close(self):
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+
+    def stats(self):
+        return {
+            "rooms": len(self.queues),
+            "queued": sum(len(queue) for queue in self.queues.values()),
+            "batches": self.batches,
+            "bookings": self.bookings,
+            "avg_batch": round(self.bookings / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+
+booking_pipeline = BookingPipeline(settings.booking_pipeline_max_batch)
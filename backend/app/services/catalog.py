@@ -0,0 +1,125 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db import models
+from backend.app.db.init_db import read_table_versions
+
+CATALOG_TABLES = (models.Resource.__tablename__, models.room_fixed_resources.name, models.Room.__tablename__)
+
+
+class ResourceRecord:
+    __slots__ = ("id", "name", "type", "availability", "created_at")
+
+    def __init__(self, id: int, name: str, type: models.ResourceType, availability: models.ResourceAvailability,
+                 created_at: datetime):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.availability = availability
+        self.created_at = created_at
+
+
+class RoomRecord:
+    __slots__ = ("id", "name", "capacity", "created_at", "fixed_resources")
+
+    def __init__(self, id: int, name: str, capacity: int, created_at: datetime,
+                 fixed_resources: Tuple[ResourceRecord, ...]):
+        self.id = id
+        self.name = name
+        self.capacity = capacity
+        self.created_at = created_at
+        self.fixed_resources = fixed_resources
+
+
+class CatalogSnapshot:
+    __slots__ = ("version", "table_versions", "built_at", "rooms", "resources", "room_ids", "resource_ids",
+                 "rooms_by_id", "resources_by_id")
+
+    def __init__(self, version: int, table_versions: Tuple[int, ...], rooms: Tuple[RoomRecord, ...],
+                 resources: Tuple[ResourceRecord, ...]):
+        self.version = version
+        self.table_versions = table_versions
+        self.built_at = time.monotonic()
+        self.rooms = rooms
+        self.resources = resources
+        self.room_ids = tuple(room.id for room in rooms)
+        self.resource_ids = tuple(resource.id for resource in resources)
+        self.rooms_by_id: Dict[int, RoomRecord] = {room.id: room for room in rooms}
+        self.resources_by_id: Dict[int, ResourceRecord] = {resource.id: resource for resource in resources}
+
+
+class Catalog:
+    def __init__(self):
+        self.version = 0
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.rebuilds = 0
+        self._lock = asyncio.Lock()
+
+    def bump(self):
+        self.version += 1
+
+    def is_current(self, max_age_seconds: float):
+        snapshot = self.snapshot
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and (not max_age_seconds or time.monotonic() - snapshot.built_at < max_age_seconds)
+        )
+
+    async def get(self, db: AsyncSession, max_age_seconds: float = 0) -> CatalogSnapshot:
+        if self.is_current(max_age_seconds):
+            return self.snapshot
+        async with self._lock:
+            if not self.is_current(max_age_seconds):
+                self.snapshot = await self._build(db, self.version)
+                self.rebuilds += 1
+        return self.snapshot
+
+    async def _build(self, db: AsyncSession, version: int) -> CatalogSnapshot:
+        # read before the rows, so the snapshot is never tagged newer than what it holds
+        table_versions = await read_table_versions(db, CATALOG_TABLES)
+        resources_result = await db.execute(
+            select(models.Resource.id, models.Resource.name, models.Resource.type, models.Resource.availability,
+                   models.Resource.created_at)
+            .order_by(models.Resource.id)
+        )
+        resources = tuple(ResourceRecord(*row) for row in resources_result)
+        resources_by_id = {resource.id: resource for resource in resources}
+
+        links_result = await db.execute(
+            select(models.room_fixed_resources.c.room_id, models.room_fixed_resources.c.resource_id)
+            .order_by(models.room_fixed_resources.c.room_id, models.room_fixed_resources.c.resource_id)
+        )
+        fixed_resources: Dict[int, list] = {}
+        for room_id, resource_id in links_result:
+            if resource_id in resources_by_id:
+                fixed_resources.setdefault(room_id, []).append(resources_by_id[resource_id])
+
+        rooms_result = await db.execute(
+            select(models.Room.id, models.Room.name, models.Room.capacity, models.Room.created_at)
+            .order_by(models.Room.id)
+        )
+        rooms = tuple(
+            RoomRecord(room_id, name, capacity, created_at, tuple(fixed_resources.get(room_id, ())))
+            for room_id, name, capacity, created_at in rooms_result
+        )
+        return CatalogSnapshot(version, table_versions, rooms, resources)
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            "version": self.version,
+            "snapshot_version": snapshot.version if snapshot else None,
+            "rooms": len(snapshot.rooms) if snapshot else 0,
+            "resources": len(snapshot.resources) if snapshot else 0,
+            "age_seconds": time.monotonic() - snapshot.built_at if snapshot else None,
+            "rebuilds": self.rebuilds,
+        }
+
+
+catalog = Catalog()
@@ -1,9 +1,16 @@
 from datetime import datetime
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, not_
+from sqlalchemy import select, delete
+from backend.app.core.config import settings
+from backend.app.core.pagination import paginate, paginate_sequence
 from backend.app.db import models, schemas
+from backend.app.services.appointment_service import EXCLUSION_VIOLATION, get_conflicting_resource_ids
+from backend.app.services.availability_index import availability_index, busy_resource_ids_query
+from backend.app.services.catalog import catalog
 from fastapi import HTTPException
+from typing import Optional
 
 
 async def create_resource(db: AsyncSession, resource: schemas.ResourceCreate):
@@ -15,19 +22,25 @@ async def create_resource(db: AsyncSession, resource: schemas.ResourceCreate):
     db.add(db_resource)
     await db.commit()
     await db.refresh(db_resource)
+    catalog.bump()
     return db_resource
 
 
 async def get_resource(db: AsyncSession, resource_id: int):
+    if settings.catalog_snapshot:
+        snapshot = await catalog.get(db, settings.catalog_snapshot_max_age_seconds)
+        return snapshot.resources_by_id.get(resource_id)
     query = select(models.Resource).filter(models.Resource.id == resource_id)
     result = await db.execute(query)
     return result.scalars().first()
 
 
-async def get_resources(db: AsyncSession):
+async def get_resources(db: AsyncSession, cursor: Optional[str] = None, limit: Optional[int] = None):
+    if settings.catalog_snapshot:
+        snapshot = await catalog.get(db, settings.catalog_snapshot_max_age_seconds)
+        return paginate_sequence(snapshot.resources, snapshot.resource_ids, models.Resource.id, cursor, limit)
     query = select(models.Resource)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, [models.Resource.id], cursor, limit)
 
 
 async def get_available_resources(db: AsyncSession):
@@ -45,25 +58,79 @@ async def get_available_movable_resources(
 ):
     start_time_dt = datetime.fromisoformat(start_time)
     end_time_dt = datetime.fromisoformat(end_time)
-    subquery = (
-        select(models.AppointmentResource.resource_id)
-        .join(models.Appointment)
+    query = (
+        select(models.Resource)
+        .filter(models.Resource.type == 'movable')
+        .filter(models.Resource.availability == 'available')
+    )
+
+    if availability_index.loaded:
+        result = await db.execute(query)
+        return [
+            resource for resource in result.scalars().all()
+            if availability_index.is_resource_free(resource.id, start_time_dt, end_time_dt)
+        ]
+
+    subquery = busy_resource_ids_query(start_time_dt, end_time_dt).subquery()
+    result = await db.execute(query.filter(~models.Resource.id.in_(subquery)))
+    return result.scalars().all()
+
+
+async def get_resource_blackouts(db: AsyncSession, resource_id: int):
+    result = await db.execute(
+        select(models.ResourceReservation)
         .filter(
-            not_(
-                (models.Appointment.start_time >= end_time_dt) |
-                (models.Appointment.end_time <= start_time_dt)
-            )
+            models.ResourceReservation.resource_id == resource_id,
+            models.ResourceReservation.kind == models.ReservationKind.blackout
         )
-        .subquery()
+        .order_by(models.ResourceReservation.start_time)
+    )
+    return result.scalars().all()
+
+
+async def create_resource_blackout(db: AsyncSession, resource_id: int, blackout: schemas.ResourceBlackoutCreate):
+    if blackout.start_time >= blackout.end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+    if await db.get(models.Resource, resource_id) is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    if await get_conflicting_resource_ids(db, [resource_id], blackout.start_time, blackout.end_time):
+        raise HTTPException(status_code=400, detail="Resource is already reserved during the selected time slot")
+
+    db_blackout = models.ResourceReservation(
+        resource_id=resource_id,
+        kind=models.ReservationKind.blackout,
+        start_time=blackout.start_time,
+        end_time=blackout.end_time
     )
+    db.add(db_blackout)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+            raise
+        raise HTTPException(status_code=400, detail="Resource is already reserved during the selected time slot")
+    await db.refresh(db_blackout)
+    availability_index.add_blackout(db_blackout.id, resource_id, db_blackout.start_time, db_blackout.end_time)
+    return db_blackout
+
 
+async def delete_resource_blackout(db: AsyncSession, resource_id: int, blackout_id: int):
     result = await db.execute(
-        select(models.Resource)
-        .filter(models.Resource.type == 'movable')
-        .filter(models.Resource.availability == 'available')
-        .filter(~models.Resource.id.in_(subquery))
+        select(models.ResourceReservation).filter(
+            models.ResourceReservation.id == blackout_id,
+            models.ResourceReservation.resource_id == resource_id,
+            models.ResourceReservation.kind == models.ReservationKind.blackout
+        )
     )
-    return result.scalars().all()
+    db_blackout = result.scalars().first()
+    if db_blackout is None:
+        raise HTTPException(status_code=404, detail="Blackout not found")
+
+    await db.execute(delete(models.ResourceReservation).where(models.ResourceReservation.id == blackout_id))
+    await db.commit()
+    availability_index.remove_blackout(blackout_id, resource_id, db_blackout.start_time)
+    return db_blackout
 
 
 async def update_resource(db: AsyncSession, resource_id: int, resource: schemas.ResourceUpdate):
@@ -82,6 +149,7 @@ async def update_resource(db: AsyncSession, resource_id: int, resource: schemas.
     db.add(db_resource)
     await db.commit()
     await db.refresh(db_resource)
+    catalog.bump()
     return db_resource
 
 
@@ -96,6 +164,7 @@ async def delete_resource(db: AsyncSession, resource_id: int):
         delete(models.Resource).where(models.Resource.id == resource_id)
     )
     await db.commit()
+    catalog.bump()
     return db_resource
 
 
@@ -114,4 +183,5 @@ async def update_resource_availability(
         db.add(resource)
         await db.commit()
         await db.refresh(resource)
+    catalog.bump()
     return resource
@@ -1,11 +1,21 @@
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from sqlalchemy.orm import joinedload, selectinload
 
+from backend.app.core.config import settings
+from backend.app.core.pagination import paginate, paginate_sequence
 from backend.app.db import models, schemas
+from backend.app.services.availability_index import availability_index, busy_room_ids_query
+from backend.app.services.catalog import catalog
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, timedelta
+from heapq import merge
+from math import ceil
+from itertools import groupby, islice
+from typing import List, Optional
+
+MAX_OCCUPANCY_BUCKETS = 5000
 
 
 async def create_room(db: AsyncSession, room: schemas.RoomCreate):
@@ -15,10 +25,9 @@ async def create_room(db: AsyncSession, room: schemas.RoomCreate):
             capacity=int(room.capacity)
         )
 
+        resources = await _get_resources_by_ids(db, room.fixed_resources)
         for resource_id in room.fixed_resources:
-            query = select(models.Resource).filter(models.Resource.id == resource_id)
-            result = await db.execute(query)
-            db_resource = result.scalars().first()
+            db_resource = resources.get(resource_id)
             if db_resource is None:
                 raise HTTPException(status_code=404, detail=f"Resource with id {resource_id} not found")
             db_resource.type = models.ResourceType.fixed
@@ -30,19 +39,32 @@ async def create_room(db: AsyncSession, room: schemas.RoomCreate):
         await db.flush()
         await db.commit()
 
+    catalog.bump()
     return db_room
 
 
+async def _get_resources_by_ids(db: AsyncSession, resource_ids):
+    if not resource_ids:
+        return {}
+    result = await db.execute(select(models.Resource).filter(models.Resource.id.in_(set(resource_ids))))
+    return {resource.id: resource for resource in result.scalars()}
+
+
 async def get_room(db: AsyncSession, room_id: int):
+    if settings.catalog_snapshot:
+        snapshot = await catalog.get(db, settings.catalog_snapshot_max_age_seconds)
+        return snapshot.rooms_by_id.get(room_id)
     query = select(models.Room).options(joinedload(models.Room.fixed_resources)).filter(models.Room.id == room_id)
     result = await db.execute(query)
     return result.scalars().first()
 
 
-async def get_rooms(db: AsyncSession):
+async def get_rooms(db: AsyncSession, cursor: Optional[str] = None, limit: Optional[int] = None):
+    if settings.catalog_snapshot:
+        snapshot = await catalog.get(db, settings.catalog_snapshot_max_age_seconds)
+        return paginate_sequence(snapshot.rooms, snapshot.room_ids, models.Room.id, cursor, limit)
     query = select(models.Room).options(joinedload(models.Room.fixed_resources))
-    result = await db.execute(query)
-    return result.scalars().unique().all()
+    return await paginate(db, query, [models.Room.id], cursor, limit)
 
 
 async def update_room(db: AsyncSession, room_id: int, room: schemas.RoomUpdate):
@@ -63,28 +85,27 @@ async def update_room(db: AsyncSession, room_id: int, room: schemas.RoomUpdate):
     resources_to_remove = current_resource_ids - new_resource_ids
     resources_to_add = new_resource_ids - current_resource_ids
 
+    resources = await _get_resources_by_ids(db, resources_to_remove | resources_to_add)
     for resource_id in resources_to_remove:
-        query = select(models.Resource).filter(models.Resource.id == resource_id)
-        result = await db.execute(query)
-        db_resource = result.scalars().first()
+        db_resource = resources.get(resource_id)
         if db_resource:
             db_resource.availability = models.ResourceAvailability.available
             db_resource.type = models.ResourceType.movable
             db_room.fixed_resources.remove(db_resource)
 
     for resource_id in resources_to_add:
-        query = select(models.Resource).filter(models.Resource.id == resource_id)
-        result = await db.execute(query)
-        db_resource = result.scalars().first()
+        db_resource = resources.get(resource_id)
         if db_resource is None:
             raise HTTPException(status_code=404, detail=f"Resource with id {resource_id} not found")
         db_resource.type = models.ResourceType.fixed
         db_resource.availability = models.ResourceAvailability.unavailable
         db_room.fixed_resources.append(db_resource)
 
+    if resources_to_remove or resources_to_add:
+        db_room.updated_at = datetime.utcnow()
     db.add(db_room)
     await db.commit()
-    await db.refresh(db_room)
+    catalog.bump()
     return db_room
 
 
@@ -120,6 +141,7 @@ async def delete_room(db: AsyncSession, room_id: int):
 
         await db.execute(delete(models.Room).where(models.Room.id == room_id))
         await db.commit()
+        catalog.bump()
 
         return {"detail": "Room deleted successfully"}
 
@@ -129,23 +151,24 @@ async def delete_room(db: AsyncSession, room_id: int):
 
 
 async def get_available_rooms(db: AsyncSession, start_time: datetime, end_time: datetime):
-    overlapping_rooms_subquery = (
-        select(models.Room.id)
-        .join(models.Appointment, models.Room.id == models.Appointment.room_id)
-        .filter(
-            models.Appointment.start_time < end_time,
-            models.Appointment.end_time > start_time
+    if availability_index.loaded:
+        query = select(models.Room).options(selectinload(models.Room.fixed_resources))
+        result = await db.execute(query)
+        rooms = [
+            room for room in result.scalars().all()
+            if availability_index.is_room_free(room.id, start_time, end_time)
+        ]
+    else:
+        overlapping_rooms_subquery = busy_room_ids_query(start_time, end_time).subquery()
+
+        query = (
+            select(models.Room)
+            .filter(~models.Room.id.in_(overlapping_rooms_subquery))
+            .options(selectinload(models.Room.fixed_resources))
         )
-    ).subquery()
 
-    query = (
-        select(models.Room)
-        .filter(~models.Room.id.in_(overlapping_rooms_subquery))
-        .options(selectinload(models.Room.fixed_resources))
-    )
-
-    result = await db.execute(query)
-    rooms = result.scalars().all()
+        result = await db.execute(query)
+        rooms = result.scalars().all()
 
     available_rooms = [room for room in rooms]
 
@@ -153,3 +176,123 @@ async def get_available_rooms(db: AsyncSession, start_time: datetime, end_time:
         raise HTTPException(status_code=404, detail="No available rooms found for the selected time.")
 
     return available_rooms
+
+
+async def find_free_slots(
+        db: AsyncSession,
+        duration: timedelta,
+        start_time: datetime,
+        end_time: datetime,
+        min_capacity: int = 0,
+        resource_ids: List[int] = (),
+        limit: int = 10
+):
+    rooms_query = select(models.Room.id).filter(models.Room.capacity >= min_capacity)
+    resource_ids = set(resource_ids)
+    if resource_ids:
+        rooms_with_resources = (
+            select(models.room_fixed_resources.c.room_id)
+            .filter(models.room_fixed_resources.c.resource_id.in_(resource_ids))
+            .group_by(models.room_fixed_resources.c.room_id)
+            .having(func.count(models.room_fixed_resources.c.resource_id) == len(resource_ids))
+        )
+        rooms_query = rooms_query.filter(models.Room.id.in_(rooms_with_resources))
+
+    eligible_rooms = rooms_query.subquery()
+    busy_query = (
+        select(eligible_rooms.c.id, models.Appointment.start_time, models.Appointment.end_time)
+        .outerjoin(
+            models.Appointment,
+            (models.Appointment.room_id == eligible_rooms.c.id)
+            & (models.Appointment.start_time < end_time)
+            & (models.Appointment.end_time > start_time)
+        )
+        .order_by(eligible_rooms.c.id, models.Appointment.start_time)
+    )
+    result = await db.execute(busy_query)
+
+    candidates = (
+        _free_slot_starts(room_id, [(row.start_time, row.end_time) for row in rows if row.start_time], start_time,
+                          end_time, duration)
+        for room_id, rows in groupby(result.all(), key=lambda row: row[0])
+    )
+    return [
+        schemas.FreeSlot(room_id=room_id, start_time=slot_start, end_time=slot_start + duration)
+        for slot_start, room_id in islice(merge(*candidates), limit)
+    ]
+
+
+async def get_occupancy(
+        db: AsyncSession,
+        start_time: datetime,
+        end_time: datetime,
+        bucket: timedelta,
+        room_ids: List[int] = ()
+):
+    bucket_seconds = bucket.total_seconds()
+    bucket_count = ceil((end_time - start_time).total_seconds() / bucket_seconds)
+    if bucket_count > MAX_OCCUPANCY_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Time window exceeds {MAX_OCCUPANCY_BUCKETS} buckets")
+
+    rooms_query = select(models.Room.id)
+    if room_ids:
+        rooms_query = rooms_query.filter(models.Room.id.in_(set(room_ids)))
+    rooms = rooms_query.subquery()
+    query = (
+        select(rooms.c.id, models.Appointment.start_time, models.Appointment.end_time)
+        .outerjoin(
+            models.Appointment,
+            (models.Appointment.room_id == rooms.c.id)
+            & (models.Appointment.start_time < end_time)
+            & (models.Appointment.end_time > start_time)
+        )
+        .order_by(rooms.c.id)
+    )
+    result = await db.execute(query)
+
+    matrix_room_ids = []
+    occupancy = []
+    for room_id, rows in groupby(result.all(), key=lambda row: row[0]):
+        row = [0.0] * bucket_count
+        for _, busy_start, busy_end in rows:
+            if busy_start is not None:
+                _add_occupancy(row, (max(busy_start, start_time) - start_time).total_seconds(),
+                               (min(busy_end, end_time) - start_time).total_seconds(), bucket_seconds)
+        matrix_room_ids.append(room_id)
+        occupancy.append(row)
+
+    return schemas.OccupancyMatrix(
+        start_time=start_time,
+        end_time=end_time,
+        bucket_minutes=int(bucket_seconds // 60),
+        room_ids=matrix_room_ids,
+        occupancy=occupancy
+    )
+
+
+def _add_occupancy(row: list, busy_start: float, busy_end: float, bucket_seconds: float):
+    # an empty interval, e.g. a zero-length booking on a bucket boundary, occupies nothing
+    if busy_end <= busy_start:
+        return
+    first = int(busy_start // bucket_seconds)
+    last = max(ceil(busy_end / bucket_seconds) - 1, first)
+    if first == last:
+        _add_partial(row, first, busy_end - busy_start, bucket_seconds)
+        return
+    _add_partial(row, first, (first + 1) * bucket_seconds - busy_start, bucket_seconds)
+    row[first + 1:last] = [1.0] * (last - first - 1)
+    _add_partial(row, last, busy_end - last * bucket_seconds, bucket_seconds)
+
+
+def _add_partial(row: list, index: int, seconds: float, bucket_seconds: float):
+    row[index] = min(round(row[index] + seconds / bucket_seconds, 3), 1.0)
+
+
+def _free_slot_starts(room_id: int, busy: list, start_time: datetime, end_time: datetime, duration: timedelta):
+    cursor = start_time
+    for busy_start, busy_end in busy:
+        if busy_start - cursor >= duration:
+            yield cursor, room_id
+        cursor = max(cursor, busy_end)
+    if end_time - cursor >= duration:
+        yield cursor, room_id
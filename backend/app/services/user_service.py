@@ -1,12 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
+from backend.app.core.auth_cache import auth_cache
+from backend.app.core.pagination import paginate
 from backend.app.db import models, schemas
-from backend.app.core.utils import get_password_hash, verify_password
+from backend.app.core.utils import get_password_hash, verify_and_update_password
 from fastapi import HTTPException
+from typing import Optional
 
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate):
-    password_hash = get_password_hash(user.password)
+    password_hash = await get_password_hash(user.password)
     db_user = models.User(
         username=user.username,
         email=user.email,
@@ -31,13 +34,14 @@ async def get_user_by_username(db: AsyncSession, username: str):
     return result.scalars().first()
 
 
-async def get_users(db: AsyncSession):
+async def get_users(db: AsyncSession, cursor: Optional[str] = None, limit: Optional[int] = None):
     query = select(models.User)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, [models.User.id], cursor, limit)
 
 
 async def update_user(db: AsyncSession, user_id: int, user: schemas.UserUpdate):
+    password_hash = await get_password_hash(user.password) if user.password else None
+
     query = select(models.User).filter(models.User.id == user_id)
     result = await db.execute(query)
     db_user = result.scalars().first()
@@ -49,13 +53,14 @@ async def update_user(db: AsyncSession, user_id: int, user: schemas.UserUpdate):
     if user.email:
         db_user.email = user.email
     if user.password:
-        db_user.password_hash = get_password_hash(user.password)
+        db_user.password_hash = password_hash
     if user.role:
         db_user.role = user.role
 
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    auth_cache.invalidate_user(user_id)
     return db_user
 
 
@@ -70,11 +75,22 @@ async def delete_user(db: AsyncSession, user_id: int):
         delete(models.User).where(models.User.id == user_id)
     )
     await db.commit()
+    auth_cache.invalidate_user(user_id)
     return db_user
 
 
 async def authenticate_user(db: AsyncSession, username: str, password: str):
     user = await get_user_by_username(db, username)
-    if not user or not verify_password(password, user.password_hash):
+    if not user:
+        return None
+    # End the read transaction so the connection is not held while the hash is checked.
+    await db.commit()
+
+    verified, new_hash = await verify_and_update_password(password, user.password_hash)
+    if not verified:
         return None
+
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     return user
@@ -0,0 +1,205 @@
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.db import models, schemas
+
+SOURCE_BATCH_SIZE = 10000
+WRITE_BATCH_SIZE = 5000
+
+ROLLUPS = {
+    "rooms": (models.RoomUtilization, models.RoomUtilization.room_id),
+    "resources": (models.ResourceUtilization, models.ResourceUtilization.resource_id),
+}
+
+Booking = Tuple[int, datetime, datetime, int]
+
+
+def split_by_day(start_time: datetime, end_time: datetime):
+    day = start_time.date()
+    segment_start = start_time
+    while segment_start < end_time:
+        next_midnight = datetime.combine(day + timedelta(days=1), time.min)
+        segment_end = min(end_time, next_midnight)
+        yield day, int((segment_end - segment_start).total_seconds())
+        day += timedelta(days=1)
+        segment_start = segment_end
+
+
+def utilization_totals(bookings: Iterable[Booking], totals: Optional[Dict] = None,
+                       start_date: Optional[date] = None, end_date: Optional[date] = None):
+    totals = {} if totals is None else totals
+    for entity_id, start_time, end_time, sign in bookings:
+        for day, seconds in split_by_day(start_time, end_time):
+            if (start_date and day < start_date) or (end_date and day > end_date):
+                continue
+            booked_seconds, count = totals.get((entity_id, day), (0, 0))
+            totals[(entity_id, day)] = (booked_seconds + sign * seconds, count + sign)
+    return totals
+
+
+async def apply_utilization(db: AsyncSession, room_bookings: Iterable[Booking] = (),
+                            resource_bookings: Iterable[Booking] = ()):
+    await _upsert(db, "rooms", utilization_totals(room_bookings))
+    await _upsert(db, "resources", utilization_totals(resource_bookings))
+
+
+async def apply_resource_link(db: AsyncSession, appointment_id: int, resource_id: int, sign: int):
+    appointment = await db.get(models.Appointment, appointment_id)
+    if appointment is not None and appointment.start_time and appointment.end_time:
+        await apply_utilization(db, resource_bookings=[
+            (resource_id, appointment.start_time, appointment.end_time, sign)
+        ])
+
+
+async def _upsert(db: AsyncSession, kind: str, totals: Dict):
+    model, key = ROLLUPS[kind]
+    rows = [
+        {key.key: entity_id, "day": day, "booked_seconds": booked_seconds, "bookings": count}
+        for (entity_id, day), (booked_seconds, count) in sorted(totals.items())
+        if booked_seconds or count
+    ]
+    if not rows:
+        return
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(model)
+    statement = statement.on_conflict_do_update(
+        index_elements=[key, model.day],
+        set_={
+            "booked_seconds": model.booked_seconds + statement.excluded.booked_seconds,
+            "bookings": model.bookings + statement.excluded.bookings,
+        }
+    )
+    await db.execute(statement, rows)
+
+
+async def get_utilization(
+        db: AsyncSession,
+        kind: str,
+        start_date: date,
+        end_date: date,
+        period: str = "day",
+        entity_ids: List[int] = ()
+):
+    model, key = ROLLUPS[kind]
+    query = (
+        select(key, model.day, model.booked_seconds, model.bookings)
+        .filter(model.day >= start_date, model.day <= end_date)
+        .order_by(key, model.day)
+    )
+    if entity_ids:
+        query = query.filter(key.in_(set(entity_ids)))
+    result = await db.execute(query)
+
+    seconds_per_day = settings.utilization_hours_per_day * 3600
+    report = []
+    for entity_id, rows in groupby(result.all(), key=lambda row: row[0]):
+        for period_start, period_rows in groupby(rows, key=lambda row: _period_start(row.day, period)):
+            period_rows = list(period_rows)
+            booked_seconds = sum(row.booked_seconds for row in period_rows)
+            if not booked_seconds:
+                continue
+            period_days = _days_in_period(period_start, period, start_date, end_date)
+            report.append(schemas.Utilization(
+                entity_id=entity_id,
+                period_start=period_start,
+                booked_seconds=booked_seconds,
+                bookings=sum(row.bookings for row in period_rows),
+                utilization=round(booked_seconds / (period_days * seconds_per_day) * 100, 2)
+            ))
+    return report
+
+
+def _period_start(day: date, period: str):
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+
+def _days_in_period(period_start: date, period: str, start_date: date, end_date: date):
+    if period != "week":
+        return 1
+    period_end = period_start + timedelta(days=6)
+    return (min(period_end, end_date) - max(period_start, start_date)).days + 1
+
+
+async def compute_utilization_from_source(db: AsyncSession, start_date: Optional[date] = None,
+                                          end_date: Optional[date] = None):
+    room_query = select(models.Appointment.room_id, models.Appointment.start_time, models.Appointment.end_time)
+    resource_query = (
+        select(models.ResourceReservation.resource_id, models.Appointment.start_time, models.Appointment.end_time)
+        .join(models.Appointment, models.Appointment.id == models.ResourceReservation.appointment_id)
+    )
+    totals = {}
+    for kind, query in (("rooms", room_query), ("resources", resource_query)):
+        query = query.filter(models.Appointment.start_time.is_not(None), models.Appointment.end_time.is_not(None))
+        if start_date:
+            query = query.filter(models.Appointment.end_time > datetime.combine(start_date, time.min))
+        if end_date:
+            query = query.filter(models.Appointment.start_time < datetime.combine(end_date + timedelta(days=1),
+                                                                                  time.min))
+        kind_totals = {}
+        result = await db.stream(query.execution_options(yield_per=SOURCE_BATCH_SIZE))
+        async for rows in result.partitions():
+            utilization_totals(((entity_id, start_time, end_time, 1) for entity_id, start_time, end_time in rows),
+                               kind_totals, start_date, end_date)
+        totals[kind] = kind_totals
+    return totals
+
+
+async def read_utilization_rollups(db: AsyncSession, start_date: Optional[date] = None,
+                                   end_date: Optional[date] = None):
+    totals = {}
+    for kind, (model, key) in ROLLUPS.items():
+        query = select(key, model.day, model.booked_seconds, model.bookings)
+        query = _filter_days(query, model, start_date, end_date)
+        result = await db.execute(query)
+        totals[kind] = {(entity_id, day): (booked_seconds, count)
+                        for entity_id, day, booked_seconds, count in result}
+    return totals
+
+
+async def backfill_utilization(db: AsyncSession, start_date: Optional[date] = None,
+                               end_date: Optional[date] = None):
+    totals = await compute_utilization_from_source(db, start_date, end_date)
+    written = {}
+    for kind, (model, key) in ROLLUPS.items():
+        await db.execute(_filter_days(delete(model), model, start_date, end_date))
+        rows = [
+            {key.key: entity_id, "day": day, "booked_seconds": booked_seconds, "bookings": count}
+            for (entity_id, day), (booked_seconds, count) in sorted(totals[kind].items())
+        ]
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            await db.execute(insert(model), rows[i:i + WRITE_BATCH_SIZE])
+        written[kind] = len(rows)
+    await db.commit()
+    return written
+
+
+async def find_utilization_mismatches(db: AsyncSession, start_date: Optional[date] = None,
+                                      end_date: Optional[date] = None):
+    expected = await compute_utilization_from_source(db, start_date, end_date)
+    actual = await read_utilization_rollups(db, start_date, end_date)
+    mismatches = []
+    for kind in ROLLUPS:
+        for entity_id, day in sorted(expected[kind].keys() | actual[kind].keys()):
+            expected_values = expected[kind].get((entity_id, day), (0, 0))
+            actual_values = actual[kind].get((entity_id, day), (0, 0))
+            if expected_values != actual_values:
+                mismatches.append({
+                    "kind": kind, "entity_id": entity_id, "day": day.isoformat(),
+                    "expected": {"booked_seconds": expected_values[0], "bookings": expected_values[1]},
+                    "actual": {"booked_seconds": actual_values[0], "bookings": actual_values[1]},
+                })
+    return mismatches
+
+
+def _filter_days(query, model, start_date: Optional[date], end_date: Optional[date]):
+    if start_date:
+        query = query.where(model.day >= start_date)
+    if end_date:
+        query = query.where(model.day <= end_date)
+    return query
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, func, select
+
+from backend.app.db import models
+from backend.app.db.init_db import AsyncSessionLocal, init_db
+from backend.app.services.availability_index import (
+    AvailabilityIndex, busy_room_ids_query, busy_resource_ids_query, find_index_mismatches
+)
+
+EPOCH = datetime(2100, 1, 1)
+BATCH_SIZE = 10000
+
+
+async def seed(rooms: int, resources: int, appointments: int, rng: random.Random):
+    async with AsyncSessionLocal() as db:
+        user = models.User(username=f"avail-{time.time_ns()}", email=f"avail-{time.time_ns()}@example.com",
+                           password_hash="", role=models.Role.user)
+        db.add(user)
+        await db.flush()
+        room_ids = (await db.execute(
+            insert(models.Room).returning(models.Room.id),
+            [{"name": f"avail-room-{i}", "capacity": 10} for i in range(rooms)]
+        )).scalars().all()
+        resource_ids = (await db.execute(
+            insert(models.Resource).returning(models.Resource.id),
+            [{"name": f"avail-resource-{i}", "type": models.ResourceType.movable,
+              "availability": models.ResourceAvailability.available} for i in range(resources)]
+        )).scalars().all()
+        await db.commit()
+
+    # a room's appointments never overlap, so resources booked only from one room never double-book
+    room_resources = {room_id: resource_ids[i::len(room_ids)] for i, room_id in enumerate(room_ids)}
+    cursors = {room_id: EPOCH for room_id in room_ids}
+    per_room = appointments // len(room_ids)
+    for offset in range(0, per_room, max(1, BATCH_SIZE // len(room_ids))):
+        rows = []
+        for room_id in room_ids:
+            for _ in range(min(max(1, BATCH_SIZE // len(room_ids)), per_room - offset)):
+                start_time = cursors[room_id] + timedelta(minutes=rng.choice((0, 15, 30, 60)))
+                end_time = start_time + timedelta(minutes=rng.choice((30, 60, 90)))
+                cursors[room_id] = end_time
+                rows.append({"room_id": room_id, "user_id": user.id, "start_time": start_time, "end_time": end_time})
+        async with AsyncSessionLocal() as db:
+            appointment_ids = (await db.execute(
+                insert(models.Appointment).returning(models.Appointment.id, sort_by_parameter_order=True), rows
+            )).scalars().all()
+            await db.execute(
+                insert(models.ResourceReservation),
+                [{"resource_id": rng.choice(room_resources[row["room_id"]]), "kind": models.ReservationKind.appointment,
+                  "appointment_id": appointment_id, "start_time": row["start_time"], "end_time": row["end_time"]}
+                 for appointment_id, row in zip(appointment_ids, rows)
+                 if room_resources[row["room_id"]] and rng.random() < 0.2]
+            )
+            await db.commit()
+    return max(cursors.values())
+
+
+async def main(rooms: int, resources: int, appointments: int, queries: int, skip_seed: bool, seed_value: int):
+    rng = random.Random(seed_value)
+    await init_db()
+    if not skip_seed:
+        started = time.perf_counter()
+        await seed(rooms, resources, appointments, rng)
+        print(f"seeded {appointments} appointments in {time.perf_counter() - started:.1f}s")
+
+    async with AsyncSessionLocal() as db:
+        horizon = (await db.execute(select(func.max(models.Appointment.end_time)))).scalar()
+        index = AvailabilityIndex()
+        started = time.perf_counter()
+        await index.load(db)
+        print(f"loaded index ({len(index.appointments)} appointments) in {time.perf_counter() - started:.1f}s")
+
+        windows = []
+        for _ in range(queries):
+            start_time = EPOCH + (horizon - EPOCH) * rng.random()
+            windows.append((start_time, start_time + timedelta(minutes=rng.choice((30, 60, 120)))))
+
+        sql_timings, index_timings, mismatches = [], [], 0
+        for start_time, end_time in windows:
+            started = time.perf_counter()
+            await db.execute(busy_room_ids_query(start_time, end_time).distinct())
+            await db.execute(busy_resource_ids_query(start_time, end_time).distinct())
+            sql_timings.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            index.busy_room_ids(start_time, end_time)
+            index.busy_resource_ids(start_time, end_time)
+            index_timings.append(time.perf_counter() - started)
+
+            if await find_index_mismatches(db, start_time, end_time, index):
+                mismatches += 1
+
+    print(f"{'path':>6} {'median ms':>10} {'max ms':>10}")
+    for name, timings in (("sql", sql_timings), ("index", index_timings)):
+        print(f"{name:>6} {statistics.median(timings) * 1000:>10.3f} {max(timings) * 1000:>10.3f}")
+    print(f"windows where index and SQL disagree: {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare SQL and in-memory availability lookups")
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--resources", type=int, default=5000)
+    parser.add_argument("--appointments", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.rooms, args.resources, args.appointments, args.queries, args.skip_seed, args.seed))
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import aliased
+
+from backend.app.core.config import settings
+from backend.app.db import models
+from backend.app.db.init_db import AsyncSessionLocal, engine, init_db
+from backend.app.services.booking_pipeline import booking_pipeline
+from backend.benchmarks.load import percentile, run_scenario
+from backend.benchmarks.seed import SEED_PASSWORD, seed
+from backend.main import app
+
+SLOT_MINUTES = 30
+
+
+def hot_room_bookings(room_ids: list, start, conflict_rate: float, rng: random.Random):
+    requested = {room_id: [] for room_id in room_ids}
+
+    def book():
+        room_id = rng.choice(room_ids)
+        slots = requested[room_id]
+        if slots and rng.random() < conflict_rate:
+            slot = rng.choice(slots)
+        else:
+            slot = len(slots)
+            slots.append(slot)
+        start_time = start + timedelta(minutes=SLOT_MINUTES * slot)
+        return "POST", "/api/appointments/", {"json": {
+            "user_id": 0, "room_id": room_id, "start_time": start_time.isoformat(),
+            "end_time": (start_time + timedelta(minutes=SLOT_MINUTES)).isoformat(), "resource_ids": []
+        }}
+
+    return book
+
+
+async def count_double_bookings(room_ids: list, start):
+    other = aliased(models.Appointment)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(func.count()).select_from(models.Appointment).join(other, and_(
+                other.room_id == models.Appointment.room_id,
+                other.id > models.Appointment.id,
+                other.start_time < models.Appointment.end_time,
+                other.end_time > models.Appointment.start_time
+            )).filter(models.Appointment.room_id.in_(room_ids), models.Appointment.start_time >= start)
+        )
+        return result.scalar()
+
+
+async def main(args):
+    await init_db()
+    data = await seed(args.rooms, 0, 0, 1, fixed_per_room=0, resources_per_appointment=0, tag=str(time.time_ns()))
+    rng = random.Random(args.random_seed)
+    start = data["seeded_until"] + timedelta(days=1)
+    results = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark",
+                                 timeout=None) as client:
+        login = await client.post("/api/users/login",
+                                  data={"username": data["usernames"][0], "password": SEED_PASSWORD})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        for round_index in range(args.rounds):
+            for mode in ("direct", "pipeline"):
+                settings.booking_pipeline = mode == "pipeline"
+                # every run books a fresh stretch of the calendar so runs never collide with each other
+                run_start = start + timedelta(days=365 * (2 * round_index + (mode == "pipeline")))
+                make_request = hot_room_bookings(data["room_ids"], run_start, args.conflict_rate, rng)
+                stats = await run_scenario(client, make_request, args.requests, args.concurrency)
+                stats["double_bookings"] = await count_double_bookings(data["room_ids"], run_start)
+                results.setdefault(mode, []).append(stats)
+                print(f"round {round_index} {mode:<9} {stats['throughput_rps']:>8.1f} req/s  "
+                      f"p50 {stats['p50_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms  "
+                      f"statuses {stats['statuses']}  double bookings {stats['double_bookings']}")
+    settings.booking_pipeline = False
+    print(f"pipeline: {booking_pipeline.stats()}")
+    await engine.dispose()
+
+    direct = percentile(sorted(run["throughput_rps"] for run in results["direct"]), 0.5)
+    pipelined = percentile(sorted(run["throughput_rps"] for run in results["pipeline"]), 0.5)
+    print(f"median throughput: direct {direct:.1f} req/s, pipeline {pipelined:.1f} req/s "
+          f"({pipelined / direct:.2f}x) on {engine.dialect.name}, "
+          f"exclusion constraints {settings.booking_exclusion_constraints}")
+    errors = sum(run["errors"] for runs in results.values() for run in runs)
+    return errors == 0 and all(run["double_bookings"] == 0 for run in results["pipeline"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare booking throughput with and without the per-room pipeline "
+                                                 "on a hot-room workload")
+    parser.add_argument("--rooms", type=int, default=4, help="number of hot rooms all bookings go to")
+    parser.add_argument("--requests", type=int, default=2000, help="bookings per run")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--conflict-rate", type=float, default=0.2,
+                        help="fraction of bookings that reuse an already requested slot")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--random-seed", type=int, default=0)
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from backend.app.db import models, schemas
+from backend.app.db.init_db import AsyncSessionLocal, init_db
+from backend.app.services import appointment_service
+
+
+async def seed(resource_count: int):
+    async with AsyncSessionLocal() as db:
+        user = models.User(username=f"bench-{time.time_ns()}", email=f"bench-{time.time_ns()}@example.com",
+                           password_hash="", role=models.Role.user)
+        room = models.Room(name="bench-room", capacity=10)
+        db.add_all([user, room])
+        await db.flush()
+        result = await db.execute(
+            insert(models.Resource).returning(models.Resource.id),
+            [
+                {"name": f"bench-resource-{i}", "type": models.ResourceType.movable,
+                 "availability": models.ResourceAvailability.available}
+                for i in range(resource_count)
+            ]
+        )
+        resource_ids = result.scalars().all()
+        await db.commit()
+        return user.id, room.id, resource_ids
+
+
+async def book(user_id: int, room_id: int, resource_ids: list, start_time: datetime):
+    appointment = schemas.AppointmentCreate(
+        user_id=user_id,
+        room_id=room_id,
+        start_time=start_time,
+        end_time=start_time + timedelta(minutes=30),
+        resource_ids=resource_ids
+    )
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await appointment_service.create_appointment(db, appointment, user_id)
+        return time.perf_counter() - started
+
+
+async def main(sizes: list, repeat: int):
+    await init_db()
+    user_id, room_id, resource_ids = await seed(max(sizes))
+    start_time = datetime(2100, 1, 1)
+    print(f"{'resources':>10} {'median ms':>10} {'p95 ms':>10}")
+    for size in sizes:
+        timings = []
+        for _ in range(repeat):
+            timings.append(await book(user_id, room_id, resource_ids[:size], start_time))
+            start_time += timedelta(hours=1)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{size:>10} {statistics.median(timings) * 1000:>10.2f} {p95 * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Booking latency as the number of resources per booking grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 20, 30])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import func, select
+
+from backend.app.core.query_budget import install_query_log, track_queries
+from backend.app.db import models, schemas
+from backend.app.db.init_db import AsyncSessionLocal, engine, init_db
+from backend.app.services import appointment_service
+from backend.app.services.utilization_service import find_utilization_mismatches
+from backend.benchmarks.seed import SEED_START, seed
+
+
+async def seed_set(args, tag: str):
+    data = await seed(args.rooms, args.resources, args.appointments, 1, resources_per_appointment=2,
+                      resource_share=args.resource_share, random_seed=args.random_seed, tag=tag)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Appointment.id).filter(models.Appointment.user_id == data["user_ids"][0])
+            .order_by(models.Appointment.id)
+        )
+        data["appointment_ids"] = result.scalars().all()
+    return data
+
+
+async def cancel_one_by_one(appointment_ids: list):
+    for appointment_id in appointment_ids:
+        async with AsyncSessionLocal() as db:
+            await appointment_service.delete_appointment(db, appointment_id)
+
+
+async def cancel_in_bulk(user_id: int):
+    async with AsyncSessionLocal() as db:
+        return await appointment_service.cancel_appointments(db, schemas.AppointmentCancellation(user_id=user_id))
+
+
+async def remaining(user_id: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(func.count()).select_from(models.Appointment)
+                                  .filter(models.Appointment.user_id == user_id))
+        return result.scalar()
+
+
+async def main(args):
+    await init_db()
+    install_query_log(engine.sync_engine)
+    tag = str(time.time_ns())
+    per_item = await seed_set(args, f"{tag}-a")
+    bulk = await seed_set(args, f"{tag}-b")
+    print(f"seeded 2 x {len(bulk['appointment_ids'])} appointments on {engine.dialect.name}")
+
+    with track_queries() as query_log:
+        started = time.perf_counter()
+        await cancel_one_by_one(per_item["appointment_ids"])
+        per_item_seconds = time.perf_counter() - started
+    per_item_statements = query_log.statements
+
+    with track_queries() as query_log:
+        started = time.perf_counter()
+        summary = await cancel_in_bulk(bulk["user_ids"][0])
+        bulk_seconds = time.perf_counter() - started
+    bulk_statements = query_log.statements
+
+    print(f"one by one: {per_item_seconds:.2f} s, {per_item_statements} statements")
+    print(f"bulk:       {bulk_seconds:.2f} s, {bulk_statements} statements, cancelled {summary.cancelled}, "
+          f"released {summary.released_resource_reservations} resource reservations")
+    print(f"speedup:    {per_item_seconds / bulk_seconds:.1f}x")
+
+    left = await remaining(per_item["user_ids"][0]) + await remaining(bulk["user_ids"][0])
+    async with AsyncSessionLocal() as db:
+        mismatches = await find_utilization_mismatches(db, SEED_START.date(), bulk["seeded_until"].date())
+    print(f"appointments left: {left}, rollup mismatches: {len(mismatches)}")
+    await engine.dispose()
+    return left == 0 and not mismatches and summary.cancelled == len(bulk["appointment_ids"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cancelling appointments one by one with one bulk "
+                                                 "cancellation")
+    parser.add_argument("--appointments", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--resources", type=int, default=2000)
+    parser.add_argument("--resource-share", type=float, default=0.5)
+    parser.add_argument("--random-seed", type=int, default=0)
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
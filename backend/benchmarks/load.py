@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from backend.app.db.init_db import engine, init_db
+from backend.benchmarks.seed import SEED_PASSWORD, SEED_START, seed
+from backend.main import app
+
+SCENARIOS = (
+    "book", "rooms_available", "movable_available", "login",
+    "list_appointments", "list_rooms", "list_resources", "list_users",
+)
+
+
+def percentile(values: list, fraction: float):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_requests(scenario: str, data: dict, headers: dict, rng: random.Random):
+    booking_slots = itertools.count()
+    booking_start = data["seeded_until"] + timedelta(days=1)
+    window_hours = max(int((data["seeded_until"] - SEED_START).total_seconds() // 3600), 1)
+
+    def window():
+        start_time = SEED_START + timedelta(hours=rng.randrange(window_hours))
+        return {"start_time": start_time.isoformat(), "end_time": (start_time + timedelta(hours=1)).isoformat()}
+
+    def book():
+        start_time = booking_start + timedelta(hours=next(booking_slots))
+        movable = data["movable_resource_ids"]
+        return "POST", "/api/appointments/", {"headers": headers, "json": {
+            "user_id": 0, "room_id": rng.choice(data["room_ids"]), "start_time": start_time.isoformat(),
+            "end_time": (start_time + timedelta(minutes=30)).isoformat(),
+            "resource_ids": rng.sample(movable, min(2, len(movable)))
+        }}
+
+    factories = {
+        "book": book,
+        "rooms_available": lambda: ("GET", "/api/rooms/available", {"params": window()}),
+        "movable_available": lambda: ("GET", "/api/resources/movable/available", {"params": window()}),
+        "login": lambda: ("POST", "/api/users/login", {
+            "data": {"username": rng.choice(data["usernames"]), "password": SEED_PASSWORD}}),
+        "list_appointments": lambda: ("GET", "/api/appointments/", {"params": {"limit": 100}}),
+        "list_rooms": lambda: ("GET", "/api/rooms/", {"params": {"limit": 100}}),
+        "list_resources": lambda: ("GET", "/api/resources/", {"params": {"limit": 100}}),
+        "list_users": lambda: ("GET", "/api/users/", {"params": {"limit": 100}}),
+    }
+    return factories[scenario]
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, requests: int, concurrency: int):
+    latencies = []
+    statuses = {}
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < requests:
+            method, url, kwargs = make_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status_code, count in statuses.items() if status_code >= 500),
+        "statuses": {str(status_code): count for status_code, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def main(args):
+    await init_db()
+    seed_started = time.perf_counter()
+    data = await seed(args.rooms, args.resources, args.appointments, args.users,
+                      random_seed=args.random_seed, tag=str(time.time_ns()))
+    seed_seconds = time.perf_counter() - seed_started
+
+    rng = random.Random(args.random_seed)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        login = await client.post("/api/users/login",
+                                  data={"username": data["usernames"][0], "password": SEED_PASSWORD})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        for scenario in args.scenarios:
+            make_request = build_requests(scenario, data, headers, rng)
+            requests = args.login_requests if scenario == "login" else args.requests
+            results[scenario] = await run_scenario(client, make_request, requests, args.concurrency)
+            print(f"{scenario:<20} {results[scenario]['throughput_rps']:>9.1f} req/s  "
+                  f"p50 {results[scenario]['p50_ms']:>8.2f} ms  p95 {results[scenario]['p95_ms']:>8.2f} ms  "
+                  f"p99 {results[scenario]['p99_ms']:>8.2f} ms  statuses {results[scenario]['statuses']}",
+                  file=sys.stderr)
+    await engine.dispose()
+
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(),
+        "database": engine.dialect.name,
+        "scale": {"rooms": args.rooms, "resources": args.resources, "appointments": args.appointments,
+                  "users": args.users, "seed_seconds": round(seed_seconds, 1)},
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a database and load test the API in-process")
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--resources", type=int, default=5000)
+    parser.add_argument("--appointments", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=200)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    asyncio.run(main(parser.parse_args()))
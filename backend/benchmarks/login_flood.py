@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from backend.app.core.utils import password_hash_pool
+from backend.app.db import models
+from backend.app.db.init_db import AsyncSessionLocal, init_db
+from backend.main import app
+
+
+def percentile(values: list, fraction: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+async def book_continuously(client: httpx.AsyncClient, headers: dict, room_id: int, stop: asyncio.Event):
+    timings = []
+    start_time = datetime(2100, 1, 1) + timedelta(days=time.time_ns() % 100000)
+    while not stop.is_set():
+        body = {"user_id": 0, "room_id": room_id, "start_time": start_time.isoformat(),
+                "end_time": (start_time + timedelta(minutes=30)).isoformat(), "resource_ids": []}
+        started = time.perf_counter()
+        response = await client.post("/api/appointments/", json=body, headers=headers)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+        start_time += timedelta(hours=1)
+        await asyncio.sleep(0.01)
+    return timings
+
+
+async def flood_logins(client: httpx.AsyncClient, username: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            await client.post("/api/users/login", data={"username": username, "password": "benchmark"})
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def main(logins: int, concurrency: int, blocking: bool):
+    if blocking:
+        password_hash_pool.run = run_inline
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        room = models.Room(name="flood-room", capacity=10)
+        db.add(room)
+        await db.commit()
+
+    username = f"flood-{time.time_ns()}"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        await client.post("/api/users/register",
+                          json={"username": username, "email": f"{username}@example.com", "password": "benchmark"})
+        token = (await client.post("/api/users/login",
+                                   data={"username": username, "password": "benchmark"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for label, flood in (("idle", False), ("login flood", True)):
+            stop = asyncio.Event()
+            booking = asyncio.create_task(book_continuously(client, headers, room.id, stop))
+            started = time.perf_counter()
+            if flood:
+                await flood_logins(client, username, logins, concurrency)
+            else:
+                await asyncio.sleep(2)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            timings = await booking
+            print(f"{label:>12}: {len(timings)} bookings in {elapsed:.1f}s, "
+                  f"p50 {statistics.median(timings) * 1000:.1f} ms, p99 {percentile(timings, 0.99) * 1000:.1f} ms")
+
+    if not blocking:
+        print(password_hash_pool.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Booking latency while logins flood the server")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--blocking", action="store_true", help="hash on the event loop, as before the worker pool")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency, args.blocking))
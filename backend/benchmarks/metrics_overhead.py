@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ["METRICS_ENABLED"] = "false"
+
+import httpx
+
+from backend.app.core.metrics import MetricsMiddleware, MetricsRegistry, instrument_engine, uninstrument_engine
+from backend.app.db import models
+from backend.app.db.init_db import AsyncSessionLocal, engine, init_db
+from backend.main import app
+
+
+async def seed(rooms: int, resources_per_room: int):
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            models.Room(
+                name=f"metrics-room-{i}", capacity=10,
+                fixed_resources=[
+                    models.Resource(name=f"metrics-resource-{i}-{j}", type=models.ResourceType.fixed,
+                                    availability=models.ResourceAvailability.unavailable)
+                    for j in range(resources_per_room)
+                ]
+            )
+            for i in range(rooms)
+        )
+        await db.commit()
+
+
+async def run_round(asgi_app, paths: list, requests: int):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://benchmark") as client:
+        started = time.perf_counter()
+        for i in range(requests):
+            response = await client.get(paths[i % len(paths)])
+            response.raise_for_status()
+        return (time.perf_counter() - started) / requests
+
+
+async def main(rooms: int, requests: int, rounds: int, max_overhead: float):
+    await init_db()
+    await seed(rooms, 3)
+    paths = ["/api/rooms/?limit=50", "/api/resources/?limit=50", "/api/rooms/1", "/api/resources/1"]
+    instrumented_app = MetricsMiddleware(app, MetricsRegistry())
+
+    await run_round(app, paths, requests)
+    baseline, instrumented = [], []
+    for _ in range(rounds):
+        baseline.append(await run_round(app, paths, requests))
+        instrument_engine(engine.sync_engine)
+        instrumented.append(await run_round(instrumented_app, paths, requests))
+        uninstrument_engine(engine.sync_engine)
+    await engine.dispose()
+
+    baseline_ms = statistics.median(baseline) * 1000
+    instrumented_ms = statistics.median(instrumented) * 1000
+    overhead = (instrumented_ms - baseline_ms) / baseline_ms * 100
+    print(f"requests per round:       {requests}")
+    print(f"baseline per request:     {baseline_ms:.3f} ms")
+    print(f"instrumented per request: {instrumented_ms:.3f} ms")
+    print(f"overhead:                 {overhead:.2f}%")
+    return overhead <= max_overhead
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cost of request metrics and SQL counters")
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--max-overhead", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.rooms, args.requests, args.rounds, args.max_overhead)) else 1)
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from backend.app.core.query_budget import install_query_log, track_queries
+from backend.app.db.init_db import engine, init_db
+from backend.main import app
+
+RESOURCES = 5
+
+
+async def measure(client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    with track_queries() as query_log:
+        response = await client.request(method, url, **kwargs)
+    if response.status_code >= 500:
+        response.raise_for_status()
+    return response, query_log
+
+
+async def main(max_repeats: int):
+    install_query_log(engine.sync_engine)
+    await init_db()
+    suffix = time.time_ns()
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await client.post("/api/users/register",
+                          json={"username": f"queries-{suffix}", "email": f"queries-{suffix}@x", "password": "pw"})
+        login = await client.post("/api/users/login", data={"username": f"queries-{suffix}", "password": "pw"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        fixed_ids = []
+        for i in range(RESOURCES):
+            response = await client.post("/api/resources/", json={
+                "name": f"queries-fixed-{suffix}-{i}", "type": "fixed", "availability": "available"})
+            fixed_ids.append(response.json()["id"])
+        movable_ids = []
+        for i in range(RESOURCES):
+            response = await client.post("/api/resources/", json={
+                "name": f"queries-movable-{suffix}-{i}", "type": "movable", "availability": "available"})
+            movable_ids.append(response.json()["id"])
+
+        with track_queries() as query_log:
+            await client.post("/api/rooms/", json={
+                "name": f"queries-room-{suffix}", "capacity": 10, "fixed_resources": fixed_ids})
+        results.append(("POST /api/rooms/", query_log))
+        rooms, _ = await measure(client, "GET", "/api/rooms/", params={"limit": 1000})
+        room_id = max(room["id"] for room in rooms.json())
+
+        _, query_log = await measure(client, "PUT", f"/api/rooms/{room_id}", json={
+            "name": f"queries-room-{suffix}", "capacity": 12, "fixed_resources": fixed_ids})
+        results.append(("PUT /api/rooms/{room_id}", query_log))
+
+        body = {"user_id": 0, "room_id": room_id, "start_time": "2100-01-01T10:00:00",
+                "end_time": "2100-01-01T11:00:00", "resource_ids": movable_ids}
+        appointment, query_log = await measure(client, "POST", "/api/appointments/", json=body, headers=headers)
+        results.append(("POST /api/appointments/", query_log))
+        appointment_id = appointment.json()["id"]
+
+        for label, url, params in (
+            ("GET /api/appointments/", "/api/appointments/", {"limit": 100}),
+            ("GET /api/rooms/", "/api/rooms/", {"limit": 100}),
+            ("GET /api/rooms/available", "/api/rooms/available",
+             {"start_time": "2100-01-01T10:00:00", "end_time": "2100-01-01T11:00:00"}),
+            ("GET /api/resources/movable/available", "/api/resources/movable/available",
+             {"start_time": "2100-01-01T10:00:00", "end_time": "2100-01-01T11:00:00"}),
+            ("GET /api/rooms/free-slots", "/api/rooms/free-slots",
+             {"duration_minutes": 30, "start_time": "2100-01-01T08:00:00", "end_time": "2100-01-01T18:00:00"}),
+        ):
+            _, query_log = await measure(client, "GET", url, params=params)
+            results.append((label, query_log))
+
+        _, query_log = await measure(client, "DELETE", f"/api/appointments/{appointment_id}",
+                                     headers=headers)
+        results.append(("DELETE /api/appointments/{appointment_id}", query_log))
+    await engine.dispose()
+
+    print(f"{'endpoint':<44} {'statements':>10} {'max repeats':>12}")
+    failed = False
+    for label, query_log in results:
+        over = query_log.max_shape_repeats > max_repeats
+        failed = failed or over
+        print(f"{label:<44} {query_log.statements:>10} {query_log.max_shape_repeats:>12}{'  OVER BUDGET' if over else ''}")
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report SQL statement counts for the hot endpoints")
+    parser.add_argument("--max-repeats", type=int, default=1,
+                        help="fail when one statement shape runs more often than this in a single request")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.max_repeats)) else 1)
@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import enum
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, select, text
+
+from backend.app.core.utils import get_password_hash
+from backend.app.db import models
+from backend.app.db.init_db import AsyncSessionLocal, engine, init_db, mark_changed
+from backend.app.services.utilization_service import backfill_utilization
+
+SEED_START = datetime(2100, 1, 1, 8)
+SEED_PASSWORD = "benchmark"
+SLOT_HOURS = 2
+BATCH_SIZE = 50000
+USE_COPY = engine.dialect.name == "postgresql" and engine.dialect.driver == "asyncpg"
+
+
+def batches(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def reserve_ids(db, table, count: int) -> range:
+    if count == 0:
+        return range(0)
+    if engine.dialect.name == "postgresql":
+        result = await db.execute(
+            text("SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+                 "nextval(pg_get_serial_sequence(:table, 'id')) + :count - 1)"),
+            {"table": table.name, "count": count}
+        )
+        last = result.scalar()
+    else:
+        result = await db.execute(select(func.coalesce(func.max(table.c.id), 0)))
+        last = result.scalar() + count
+    return range(last - count + 1, last + 1)
+
+
+async def write_rows(db, table, columns, rows):
+    written = 0
+    if USE_COPY:
+        # COPY goes around the session, so the table's ETag version is bumped by hand
+        mark_changed(db.sync_session, [table.name])
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        for batch in batches(rows):
+            await raw_connection.driver_connection.copy_records_to_table(
+                table.name, columns=columns,
+                records=[tuple(value.name if isinstance(value, enum.Enum) else value for value in row)
+                         for row in batch]
+            )
+            written += len(batch)
+    else:
+        for batch in batches(rows):
+            await db.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+            written += len(batch)
+    return written
+
+
+async def seed(rooms: int, resources: int, appointments: int, users: int, fixed_per_room: int = 2,
+               resources_per_appointment: int = 1, resource_share: float = 0.3, random_seed: int = 0,
+               tag: Optional[str] = None):
+    rng = random.Random(random_seed)
+    tag = tag or f"s{random_seed}"
+    now = datetime.utcnow()
+    password_hash = await get_password_hash(SEED_PASSWORD)
+    fixed_count = min(resources, rooms * fixed_per_room)
+    movable_count = resources - fixed_count
+    rooms_with_resources = min(rooms, movable_count // resources_per_appointment) if resources_per_appointment else 0
+
+    async with AsyncSessionLocal() as db:
+        user_ids = await reserve_ids(db, models.User.__table__, users)
+        room_ids = await reserve_ids(db, models.Room.__table__, rooms)
+        resource_ids = await reserve_ids(db, models.Resource.__table__, resources)
+        appointment_ids = await reserve_ids(db, models.Appointment.__table__, appointments)
+        movable_ids = resource_ids[fixed_count:]
+
+        await write_rows(db, models.User.__table__,
+                         ["id", "username", "email", "password_hash", "role", "created_at", "updated_at"], (
+            (user_id, f"bench-{tag}-{i}", f"bench-{tag}-{i}@example.com", password_hash, models.Role.user, now, now)
+            for i, user_id in enumerate(user_ids)
+        ))
+        await write_rows(db, models.Room.__table__, ["id", "name", "capacity", "created_at", "updated_at"], (
+            (room_id, f"bench-room-{tag}-{i}", rng.randint(2, 40), now, now)
+            for i, room_id in enumerate(room_ids)
+        ))
+        await write_rows(db, models.Resource.__table__,
+                         ["id", "name", "type", "availability", "created_at", "updated_at"], (
+            (resource_id, f"bench-resource-{tag}-{i}",
+             models.ResourceType.fixed if i < fixed_count else models.ResourceType.movable,
+             models.ResourceAvailability.unavailable if i < fixed_count else models.ResourceAvailability.available,
+             now, now)
+            for i, resource_id in enumerate(resource_ids)
+        ))
+        await write_rows(db, models.room_fixed_resources, ["room_id", "resource_id"], (
+            (room_ids[i // fixed_per_room], resource_ids[i]) for i in range(fixed_count)
+        ))
+
+        # each room gets one appointment per slot, so rooms never overlap; within a slot every room
+        # draws from its own block of movable resources, so resources never overlap either
+        bookings = []
+        for i, appointment_id in enumerate(appointment_ids):
+            slot, room_index = divmod(i, rooms)
+            start_time = SEED_START + timedelta(hours=SLOT_HOURS * slot + rng.randrange(SLOT_HOURS))
+            end_time = start_time + timedelta(minutes=rng.choice((30, 45, 60)))
+            booked = ()
+            if room_index < rooms_with_resources and rng.random() < resource_share:
+                offset = slot * resources_per_appointment * 7 + room_index * resources_per_appointment
+                booked = [movable_ids[(offset + j) % movable_count] for j in range(resources_per_appointment)]
+            bookings.append((appointment_id, room_ids[room_index], user_ids[i % users], start_time, end_time, booked))
+
+        await write_rows(db, models.Appointment.__table__,
+                         ["id", "room_id", "user_id", "start_time", "end_time", "created_at", "updated_at"], (
+            (appointment_id, room_id, user_id, start_time, end_time, now, now)
+            for appointment_id, room_id, user_id, start_time, end_time, _ in bookings
+        ))
+        links = await write_rows(db, models.ResourceReservation.__table__,
+                                 ["resource_id", "kind", "appointment_id", "start_time", "end_time", "created_at"], (
+            (resource_id, models.ReservationKind.appointment, appointment_id, start_time, end_time, now)
+            for appointment_id, _, _, start_time, end_time, booked in bookings
+            for resource_id in booked
+        ))
+        await db.commit()
+        seeded_until = SEED_START + timedelta(hours=SLOT_HOURS * ((appointments - 1) // max(rooms, 1) + 1))
+        await backfill_utilization(db, SEED_START.date(), seeded_until.date())
+
+    return {
+        "user_ids": list(user_ids),
+        "usernames": [f"bench-{tag}-{i}" for i in range(users)],
+        "room_ids": list(room_ids),
+        "movable_resource_ids": list(movable_ids),
+        "appointment_resources": links,
+        "seeded_until": seeded_until,
+    }
+
+
+async def main(args):
+    await init_db()
+    started = time.perf_counter()
+    data = await seed(args.rooms, args.resources, args.appointments, args.users, args.fixed_per_room,
+                      args.resources_per_appointment, args.resource_share, args.random_seed, args.tag)
+    await engine.dispose()
+    print(f"seeded {args.rooms} rooms, {args.resources} resources, {args.appointments} appointments "
+          f"({data['appointment_resources']} resource bookings), {args.users} users "
+          f"in {time.perf_counter() - started:.1f} s using {'COPY' if USE_COPY else 'executemany'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the configured database with synthetic booking data")
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--resources", type=int, default=5000)
+    parser.add_argument("--appointments", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--fixed-per-room", type=int, default=2)
+    parser.add_argument("--resources-per-appointment", type=int, default=1)
+    parser.add_argument("--resource-share", type=float, default=0.3,
+                        help="fraction of appointments that also book movable resources")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--tag", help="suffix for generated names; defaults to the random seed")
+    asyncio.run(main(parser.parse_args()))
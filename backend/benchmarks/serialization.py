@@ -0,0 +1,77 @@
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.app.db import models, schemas
+
+
+def build_appointments(count: int):
+    now = datetime(2100, 1, 1)
+    return [
+        models.Appointment(id=i, room_id=i % 100, user_id=i % 1000, start_time=now + timedelta(hours=i),
+                           end_time=now + timedelta(hours=i, minutes=30), created_at=now)
+        for i in range(count)
+    ]
+
+
+def build_rooms(count: int, resources_per_room: int):
+    now = datetime(2100, 1, 1)
+    return [
+        models.Room(
+            id=i, name=f"room-{i}", capacity=10, created_at=now,
+            fixed_resources=[
+                models.Resource(id=i * resources_per_room + j, name=f"resource-{j}", type=models.ResourceType.fixed,
+                                availability=models.ResourceAvailability.unavailable, created_at=now)
+                for j in range(resources_per_room)
+            ]
+        )
+        for i in range(count)
+    ]
+
+
+def old_path(schema, items):
+    return json.dumps(jsonable_encoder([schema.model_validate(item) for item in items])).encode()
+
+
+def new_path(adapter, items):
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def measure(label: str, func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f"{label:<28} {best * 1000:>10.1f} ms")
+    return best
+
+
+def main(count: int, resources_per_room: int, repeat: int):
+    appointments = build_appointments(count)
+    rooms = build_rooms(count, resources_per_room)
+
+    assert json.loads(old_path(schemas.Appointment, appointments[:10])) == \
+        json.loads(new_path(schemas.AppointmentList, appointments[:10]))
+    assert json.loads(old_path(schemas.Room, rooms[:10])) == json.loads(new_path(schemas.RoomList, rooms[:10]))
+
+    for name, schema, adapter, items in (
+        ("appointments", schemas.Appointment, schemas.AppointmentList, appointments),
+        ("rooms", schemas.Room, schemas.RoomList, rooms),
+    ):
+        old = measure(f"{name} jsonable_encoder", lambda: old_path(schema, items), repeat)
+        new = measure(f"{name} TypeAdapter", lambda: new_path(adapter, items), repeat)
+        print(f"{name}: {old / new:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare list response serialization paths")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--resources-per-room", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.count, args.resources_per_room, args.repeat)
@@ -1,15 +1,43 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.app.api import appointment_router, appointment_resource_router, resource_router, room_router, user_router
-from backend.app.db.init_db import init_db
+from backend.app.api import (
+    appointment_router, appointment_resource_router, availability_router, internal_router, metrics_router,
+    resource_router, room_router, user_router, utilization_router
+)
+from backend.app.core.broadcast import broadcast
+from backend.app.core.config import settings
+from backend.app.core.dependencies import get_current_admin_user
+from backend.app.core.etag import NotModified, not_modified_handler
+from backend.app.core.metrics import MetricsMiddleware, instrument_engine
+from backend.app.core.pagination import NEXT_CURSOR_HEADER
+from backend.app.core.query_budget import QueryBudgetMiddleware, install_query_log
+from backend.app.core.utils import calibrate_password_hashing
+from backend.app.db.init_db import engine, init_db, AsyncSessionLocal
+from backend.app.services.availability_index import availability_index
+from backend.app.services.booking_pipeline import booking_pipeline
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_exception_handler(NotModified, not_modified_handler)
 
 
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    if settings.password_hash_target_ms:
+        await calibrate_password_hashing(settings.password_hash_target_ms)
+    if settings.availability_index:
+        async with AsyncSessionLocal() as db:
+            await availability_index.load(db)
+    await broadcast.connect()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await booking_pipeline.close()
+    await broadcast.disconnect()
+    await engine.dispose()
 
 
 app.add_middleware(
@@ -18,8 +46,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+if settings.metrics_enabled:
+    instrument_engine(engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
+if settings.query_budget_max_repeats:
+    install_query_log(engine.sync_engine)
+    app.add_middleware(QueryBudgetMiddleware,
+                       max_repeats=settings.query_budget_max_repeats,
+                       raise_on_exceed=settings.query_budget_raise)
+
 
 app.include_router(appointment_router.router,
                    prefix="/api/appointments",
@@ -36,6 +75,18 @@ app.include_router(room_router.router,
 app.include_router(user_router.router,
                    prefix="/api/users",
                    tags=["Users"])
+app.include_router(availability_router.router,
+                   prefix="/api/availability",
+                   tags=["Availability"])
+app.include_router(utilization_router.router,
+                   prefix="/api/utilization",
+                   tags=["Utilization"])
+app.include_router(internal_router.router,
+                   prefix="/internal",
+                   tags=["Internal"],
+                   dependencies=[Depends(get_current_admin_user)])
+app.include_router(metrics_router.router,
+                   tags=["Metrics"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+
+from backend.app.db.init_db import AsyncSessionLocal, engine, init_db
+from backend.app.services.utilization_service import backfill_utilization, find_utilization_mismatches
+
+
+async def main(command: str, start_date: date, end_date: date):
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        if command == "backfill":
+            written = await backfill_utilization(db, start_date, end_date)
+            print(f"wrote {written['rooms']} room and {written['resources']} resource rollup rows")
+            ok = True
+        else:
+            mismatches = await find_utilization_mismatches(db, start_date, end_date)
+            for mismatch in mismatches:
+                print(json.dumps(mismatch))
+            print(f"{len(mismatches)} mismatched rollup rows", file=sys.stderr)
+            ok = not mismatches
+    await engine.dispose()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the daily utilization rollups")
+    parser.add_argument("command", choices=["backfill", "check"],
+                        help="rebuild rollups from appointments, or diff rollups against them")
+    parser.add_argument("--start-date", type=date.fromisoformat)
+    parser.add_argument("--end-date", type=date.fromisoformat)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.command, args.start_date, args.end_date)) else 1)
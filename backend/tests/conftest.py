@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+import httpx
+import pytest
+
+from backend.app.core.query_budget import install_query_log, track_queries
+from backend.app.db.init_db import engine, init_db
+from backend.main import app
+
+
+@pytest.fixture(scope="session")
+async def database():
+    await init_db()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def client(database):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def query_counter():
+    install_query_log(engine.sync_engine)
+    return track_queries
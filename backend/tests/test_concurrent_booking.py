@@ -0,0 +1,83 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.db import models, schemas
+from backend.app.db.init_db import create_booking_exclusion_constraints, engine_options, init_db
+from backend.app.services import appointment_service
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+BOOKINGS = 50
+
+pytestmark = pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+
+@pytest.fixture(scope="module")
+async def session_factory():
+    pg_engine = create_async_engine(TEST_POSTGRES_URL, **engine_options(TEST_POSTGRES_URL))
+    await init_db(pg_engine)
+    async with pg_engine.begin() as conn:
+        await create_booking_exclusion_constraints(conn)
+    yield sessionmaker(bind=pg_engine, class_=AsyncSession, expire_on_commit=False)
+    await pg_engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def exclusion_constraints(monkeypatch):
+    # the services skip their overlap pre-checks, so every conflict is reported by the constraints
+    monkeypatch.setattr(settings, "booking_exclusion_constraints", True)
+
+
+async def seed(session_factory, rooms: int):
+    async with session_factory() as db:
+        suffix = datetime.now().timestamp()
+        user = models.User(username=f"race-{suffix}", email=f"race-{suffix}@example.com",
+                           password_hash="", role=models.Role.user)
+        resource = models.Resource(name=f"race-resource-{suffix}", type=models.ResourceType.movable,
+                                   availability=models.ResourceAvailability.available)
+        room_list = [models.Room(name=f"race-room-{suffix}-{i}", capacity=10) for i in range(rooms)]
+        db.add_all([user, resource, *room_list])
+        await db.commit()
+        return user.id, [room.id for room in room_list], resource.id
+
+
+async def book(session_factory, appointment: schemas.AppointmentCreate):
+    async with session_factory() as db:
+        try:
+            await appointment_service.create_appointment(db, appointment, appointment.user_id)
+            return None
+        except HTTPException as e:
+            return e
+
+
+async def race(session_factory, user_id: int, room_ids, resource_ids):
+    start_time = datetime(2100, 1, 1, 9)
+    results = await asyncio.gather(*(
+        book(session_factory, schemas.AppointmentCreate(
+            user_id=user_id, room_id=room_id, start_time=start_time,
+            end_time=start_time + timedelta(hours=1), resource_ids=resource_ids
+        ))
+        for room_id in room_ids
+    ))
+    assert results.count(None) == 1
+    rejections = [error for error in results if error is not None]
+    assert all(error.status_code == 400 for error in rejections)
+    return rejections
+
+
+async def test_one_booking_wins_a_room(session_factory):
+    user_id, (room_id,), _ = await seed(session_factory, 1)
+    rejections = await race(session_factory, user_id, [room_id] * BOOKINGS, [])
+    assert {error.detail for error in rejections} == {"Room is not available for the selected time slot"}
+
+
+async def test_one_booking_wins_a_resource(session_factory):
+    user_id, room_ids, resource_id = await seed(session_factory, BOOKINGS)
+    rejections = await race(session_factory, user_id, room_ids, [resource_id])
+    assert all(str(resource_id) in error.detail for error in rejections)
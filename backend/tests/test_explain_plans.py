@@ -0,0 +1,137 @@
+import json
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+
+from backend.app.db import models, schemas
+from backend.app.db.init_db import AsyncSessionLocal
+from backend.app.services import (
+    appointment_resource_service, appointment_series_service, appointment_service, resource_service, room_service
+)
+from backend.benchmarks.seed import seed
+
+# tables whose size grows with booking history; a full scan of one of these is a plan regression
+HISTORY_TABLES = {models.Appointment.__tablename__, models.ResourceReservation.__tablename__}
+
+
+class StatementLog:
+    def __init__(self):
+        self.label = None
+        self.statements = {}
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label is not None and not executemany and statement.lstrip().upper().startswith(
+                ("SELECT", "UPDATE", "DELETE")):
+            self.statements.setdefault((self.label, statement), parameters)
+
+    @contextmanager
+    def capture(self, label: str):
+        self.label = label
+        try:
+            yield
+        finally:
+            self.label = None
+
+
+async def call(log: StatementLog, label: str, function, *args, **kwargs):
+    with log.capture(label):
+        async with AsyncSessionLocal() as db:
+            try:
+                return await function(db, *args, **kwargs)
+            except HTTPException:
+                return None
+
+
+async def exercise(log: StatementLog, data: dict):
+    room_id, other_room_id = data["room_ids"][:2]
+    user_id = data["user_ids"][0]
+    resource_ids = data["movable_resource_ids"]
+    # upcoming bookings, just past all booking history, like the ones users make
+    async with AsyncSessionLocal() as db:
+        start = (await db.execute(select(func.max(models.Appointment.end_time)))).scalar() + timedelta(days=1)
+    window = (start, start + timedelta(hours=1))
+
+    def booking(hours: int, booked_resource_ids: list):
+        return schemas.AppointmentCreate(user_id=user_id, room_id=room_id, start_time=start + timedelta(hours=hours),
+                                         end_time=start + timedelta(hours=hours, minutes=30),
+                                         resource_ids=booked_resource_ids)
+
+    appointment = await call(log, "create appointment", appointment_service.create_appointment,
+                             booking(0, resource_ids[:2]), user_id)
+    await call(log, "create appointments batch", appointment_service.create_appointments_batch, room_id,
+               [(booking(2, resource_ids[2:3]), user_id), (booking(3, []), user_id)])
+    await call(log, "update appointment", appointment_service.update_appointment, appointment.id,
+               schemas.AppointmentUpdate(room_id=other_room_id, start_time=start + timedelta(hours=4),
+                                         end_time=start + timedelta(hours=5), resource_ids=resource_ids[1:3]))
+    await call(log, "series conflicts", appointment_series_service.find_series_conflicts, room_id,
+               resource_ids[:2], [(start + timedelta(weeks=i), start + timedelta(weeks=i, hours=1)) for i in range(8)])
+    await call(log, "appointments by user", appointment_service.get_appointments, user_id=user_id, limit=50)
+    await call(log, "appointments by room and time", appointment_service.get_appointments_by_filters,
+               room_id=room_id, start_time=start - timedelta(days=7), end_time=start, limit=50)
+    await call(log, "appointment resources", appointment_resource_service.get_appointment_resources, appointment.id)
+    await call(log, "available rooms", room_service.get_available_rooms, *window)
+    await call(log, "available movable resources", resource_service.get_available_movable_resources,
+               *(moment.isoformat() for moment in window))
+    await call(log, "free slots", room_service.find_free_slots, timedelta(minutes=30), start,
+               start + timedelta(hours=10))
+    await call(log, "occupancy", room_service.get_occupancy, start, start + timedelta(days=1), timedelta(hours=1),
+               [room_id, other_room_id])
+    await call(log, "resource blackouts", resource_service.get_resource_blackouts, resource_ids[0])
+    await call(log, "delete appointment", appointment_service.delete_appointment, appointment.id)
+    await call(log, "cancel appointments", appointment_service.cancel_appointments,
+               schemas.AppointmentCancellation(room_id=room_id, start_time=start, end_time=start + timedelta(days=1)))
+
+
+def full_scans(conn, statement: str, parameters):
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return sorted(set(_postgres_seq_scans(plan[0]["Plan"])))
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    # SQLite reports a full table or index walk as "SCAN <table>", and index lookups as "SEARCH <table>"
+    return sorted({
+        detail.split()[1] for _, _, _, detail in rows
+        if detail.startswith("SCAN ") and detail.split()[1] in HISTORY_TABLES
+    })
+
+
+def _postgres_seq_scans(node: dict):
+    if node["Node Type"].endswith("Seq Scan") and node.get("Relation Name") in HISTORY_TABLES:
+        yield node["Relation Name"]
+    for child in node.get("Plans", ()):
+        yield from _postgres_seq_scans(child)
+
+
+def explain_all(conn, statements: dict):
+    return [
+        (label, statement, full_scans(conn, statement, parameters))
+        for (label, statement), parameters in statements.items()
+    ]
+
+
+@pytest.fixture(scope="module")
+async def seeded(database):
+    data = await seed(20, 200, 2000, 10, resources_per_appointment=2, resource_share=0.5, tag="explain")
+    async with database.begin() as conn:
+        for table in sorted(HISTORY_TABLES):
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+    return data
+
+
+async def test_booking_statements_use_indexes(database, seeded):
+    log = StatementLog()
+    event.listen(database.sync_engine, "before_cursor_execute", log.record)
+    try:
+        await exercise(log, seeded)
+    finally:
+        event.remove(database.sync_engine, "before_cursor_execute", log.record)
+
+    async with database.connect() as conn:
+        results = await conn.run_sync(explain_all, log.statements)
+    assert results
+    scans = [f"{label}: full scan of {', '.join(tables)}\n    {' '.join(statement.split())}"
+             for label, statement, tables in results if tables]
+    assert not scans, "\n".join(scans)
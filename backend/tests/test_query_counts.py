@@ -0,0 +1,97 @@
+import itertools
+
+import pytest
+
+from backend.app.core.auth_cache import auth_cache
+
+SLOT = {"start_time": "2100-01-01T10:00:00", "end_time": "2100-01-01T11:00:00"}
+FREE = {"start_time": "2100-02-01T10:00:00", "end_time": "2100-02-01T11:00:00"}
+DAYS = itertools.count(2)
+
+
+async def create_resources(client, name, type, count=3):
+    ids = []
+    for i in range(count):
+        response = await client.post("/api/resources/", json={
+            "name": f"{name}-{i}", "type": type, "availability": "available"})
+        ids.append(response.json()["id"])
+    return ids
+
+
+@pytest.fixture(scope="module")
+async def user(client):
+    response = await client.post("/api/users/register",
+                                 json={"username": "queries", "email": "queries@x", "password": "pw"})
+    login = await client.post("/api/users/login", data={"username": "queries", "password": "pw"})
+    return response.json()["id"], {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+async def fixed_ids(client):
+    return await create_resources(client, "queries-fixed", "fixed")
+
+
+@pytest.fixture(scope="module")
+async def movable_ids(client):
+    return await create_resources(client, "queries-movable", "movable")
+
+
+@pytest.fixture(scope="module")
+async def room_id(client, fixed_ids):
+    response = await client.post("/api/rooms/", json={
+        "name": "queries-room", "capacity": 10, "fixed_resources": fixed_ids})
+    return response.json()["id"]
+
+
+@pytest.fixture
+async def appointment_id(client, user, room_id, movable_ids):
+    _, headers = user
+    day = next(DAYS)
+    response = await client.post("/api/appointments/", headers=headers, json={
+        "user_id": 0, "room_id": room_id, "resource_ids": movable_ids,
+        "start_time": f"2100-01-{day:02}T10:00:00", "end_time": f"2100-01-{day:02}T11:00:00"})
+    return response.json()["id"]
+
+
+async def count(query_counter, client, method, url, **kwargs):
+    with query_counter() as query_log:
+        response = await client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    assert query_log.max_shape_repeats == 1
+    return query_log.statements
+
+
+async def test_create_room(query_counter, client, fixed_ids):
+    assert await count(query_counter, client, "POST", "/api/rooms/", json={
+        "name": "queries-new-room", "capacity": 10, "fixed_resources": fixed_ids}) == 5
+
+
+async def test_update_room(query_counter, client, room_id, fixed_ids):
+    assert await count(query_counter, client, "PUT", f"/api/rooms/{room_id}", json={
+        "name": "queries-room", "capacity": 12, "fixed_resources": fixed_ids}) == 4
+
+
+async def test_create_appointment(query_counter, client, user, room_id, movable_ids):
+    user_id, headers = user
+    # cold auth cache, so the token's users lookup is counted too
+    auth_cache.invalidate_user(user_id)
+    assert await count(query_counter, client, "POST", "/api/appointments/", headers=headers, json={
+        "user_id": 0, "room_id": room_id, "resource_ids": movable_ids, **SLOT}) == 8
+
+
+@pytest.mark.parametrize("url, params, statements", [
+    ("/api/appointments/", {"limit": 100}, 2),
+    ("/api/rooms/", {"limit": 100}, 2),
+    ("/api/rooms/available", FREE, 2),
+    ("/api/resources/movable/available", FREE, 1),
+    ("/api/rooms/free-slots",
+     {"duration_minutes": 30, "start_time": "2100-01-01T08:00:00", "end_time": "2100-01-01T18:00:00"}, 1),
+])
+async def test_read(query_counter, client, appointment_id, url, params, statements):
+    assert await count(query_counter, client, "GET", url, params=params) == statements
+
+
+async def test_delete_appointment(query_counter, client, user, appointment_id):
+    _, headers = user
+    assert await count(query_counter, client, "DELETE", f"/api/appointments/{appointment_id}",
+                       headers=headers) == 7